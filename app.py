@@ -14,7 +14,7 @@ def load_config():
 
 def main(cfg: PyGameConfig):
     theme = pygame_theme_from_file(cfg.themename)
-    players = Opponents(cfg.player1, cfg.player2)
+    players = Opponents(cfg.player1, cfg.player2, cfg.player1_options, cfg.player2_options)
     game = PyGame(players, theme)
     game.main()
 
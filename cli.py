@@ -1,3 +1,4 @@
+from argparse import ArgumentParser
 from pathlib import Path
 import yaml
 
@@ -13,14 +14,20 @@ def load_config() -> CliConfig:
     return CliConfig(**args)
 
 
-def main(cfg: CliConfig):
+def main(cfg: CliConfig, every: int = 1):
     b = Board()
     theme = theme_from_file(cfg.themename)
-    display = Terminal(theme)
-    players = Opponents(cfg.player1, cfg.player2)
+    display = Terminal(theme, cfg.incremental, every)
+    players = Opponents(cfg.player1, cfg.player2, cfg.player1_options, cfg.player2_options)
     display.main(players, b)
 
 
 if __name__ == "__main__":
+    parser = ArgumentParser(description="Play Connect 4 in the terminal.")
+    parser.add_argument("--every", type=int, default=1, help="show the board every N moves")
+    parser.add_argument(
+        "--quiet", action="store_true", help="only print the result and moves of the game"
+    )
+    args = parser.parse_args()
     cfg = load_config()
-    main(cfg)
+    main(cfg, 0 if args.quiet else args.every)
@@ -1 +1 @@
-from connect4.board import Board, Piece, WinState
+from connect4.board import Board, BoardBatch, Piece, WinState
@@ -0,0 +1,285 @@
+from argparse import ArgumentParser
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from itertools import combinations
+from typing import IO, Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import json
+import math
+import os
+import time
+import yaml
+
+from connect4.board import Board, WinState
+from connect4.players import Opponents
+from connect4.session import GameSession
+
+
+class PlayerSpec(NamedTuple):
+    """Arguments for create_player, and the label the player is reported under."""
+
+    name: str
+    options: Dict[str, Any] = {}
+    label: str = ""
+
+    @classmethod
+    def parse(cls, spec: str) -> "PlayerSpec":
+        """Reads "name" or "name:key=value,key=value", e.g. "mcts:its=500,batch=8"."""
+        name, _, args = spec.partition(":")
+        if name == "human":
+            raise ValueError("Human players can't play headless games.")
+        options = {}
+        for arg in filter(None, args.split(",")):
+            key, _, value = arg.partition("=")
+            options[key] = yaml.safe_load(value)
+        return cls(name, options, spec)
+
+
+class GameResult(NamedTuple):
+    p1: str
+    p2: str
+    # Piece value of the winner, 0 for a draw
+    winner: int
+    moves: int
+    seconds: float
+
+    @property
+    def score(self) -> float:
+        """Points for p1: 1 for a win, 0.5 for a draw and 0 for a loss."""
+        return (1 + self.winner) / 2
+
+
+class SPRTResult(NamedTuple):
+    # True if H1 was accepted, False if H0 was, None if max_games ran out first
+    accepted: Optional[bool]
+    llr: float
+    wins: int
+    draws: int
+    losses: int
+
+
+class Standing(NamedTuple):
+    label: str
+    games: int
+    wins: int
+    draws: int
+    losses: int
+    elo: float
+
+    @property
+    def score(self) -> float:
+        return (self.wins + 0.5 * self.draws) / self.games if self.games else 0.0
+
+
+def play(players: Opponents, b: Optional[Board] = None) -> Tuple[WinState, int]:
+    """Plays a game to the end without rendering it. Returns the final state and number of moves."""
+    session = GameSession(b or Board(), players.curr_piece)
+    while not session.is_ended:
+        session.play(players.get_action(session.board))
+        players.swap()
+    return session.winstate, len(session.moves)
+
+
+def play_game(p1: PlayerSpec, p2: PlayerSpec) -> GameResult:
+    """Creates the two players, plays one game and releases them."""
+    players = Opponents(p1.name, p2.name, p1.options, p2.options)
+    start = time.perf_counter()
+    try:
+        winstate, moves = play(players)
+    finally:
+        players.close()
+    seconds = time.perf_counter() - start
+    winner = int(winstate.winner)
+    return GameResult(p1.label or p1.name, p2.label or p2.name, winner, moves, seconds)
+
+
+def schedule(specs: Sequence[PlayerSpec], games: int) -> List[Tuple[PlayerSpec, PlayerSpec]]:
+    """games games between every pair of players, alternating who plays first."""
+    return [
+        (a, b) if g % 2 == 0 else (b, a) for a, b in combinations(specs, 2) for g in range(games)
+    ]
+
+
+def run_games(
+    pairings: Sequence[Tuple[PlayerSpec, PlayerSpec]],
+    workers: Optional[int] = None,
+    pool: Optional[Executor] = None,
+    out: Optional[IO[str]] = None,
+) -> List[GameResult]:
+    """Plays the games across a process pool, writing each result to out as a JSON line as soon
+    as it finishes. A pool can be passed in to reuse its processes.
+    Returns the results in the order the games finished."""
+    executor = pool or ProcessPoolExecutor(workers or os.cpu_count())
+    results = []
+    try:
+        futures = [executor.submit(play_game, p1, p2) for p1, p2 in pairings]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if out is not None:
+                out.write(json.dumps(result._asdict()) + "\n")
+                out.flush()
+    finally:
+        if pool is None:
+            executor.shutdown(cancel_futures=True)
+    return results
+
+
+def elo_ratings(results: Sequence[GameResult], iterations: int = 1000) -> Dict[str, float]:
+    """Maximum likelihood Bradley-Terry ratings on the Elo scale, averaging 0. A virtual draw
+    between every pair that met keeps ratings finite for players who never won or never lost."""
+    labels = sorted({r.p1 for r in results} | {r.p2 for r in results})
+    points = {label: 0.0 for label in labels}
+    played: Dict[Tuple[str, str], float] = {}
+    for r in results:
+        points[r.p1] += r.score
+        points[r.p2] += 1 - r.score
+        for pair in ((r.p1, r.p2), (r.p2, r.p1)):
+            played[pair] = played.get(pair, 0) + 1
+    for a, b in played:
+        played[a, b] += 1
+        points[a] += 0.5
+
+    strength = {label: 1.0 for label in labels}
+    for _ in range(iterations):
+        for a in labels:
+            denominator = sum(
+                n / (strength[a] + strength[b]) for (x, b), n in played.items() if x == a
+            )
+            if denominator:
+                strength[a] = points[a] / denominator
+        mean = sum(math.log(s) for s in strength.values()) / len(labels)
+        strength = {k: math.exp(math.log(s) - mean) for k, s in strength.items()}
+    return {k: 400 * math.log10(s) for k, s in strength.items()}
+
+
+def standings(results: Sequence[GameResult]) -> List[Standing]:
+    """Each player's record and Elo rating, best first."""
+    elo = elo_ratings(results)
+    record = {label: [0, 0, 0] for label in elo}
+    for r in results:
+        for label, sign in ((r.p1, 1), (r.p2, -1)):
+            record[label][1 - sign * r.winner] += 1
+    table = [
+        Standing(label, sum(wdl), wdl[0], wdl[1], wdl[2], elo[label]) for label, wdl in record.items()
+    ]
+    return sorted(table, key=lambda s: -s.elo)
+
+
+def format_standings(table: Sequence[Standing]) -> str:
+    width = max([len(s.label) for s in table] + [6])
+    lines = [f"{'player':<{width}}  games   wins  draws losses  score    elo"]
+    for s in table:
+        lines.append(
+            f"{s.label:<{width}}  {s.games:5d}  {s.wins:5d}  {s.draws:5d}  {s.losses:5d}"
+            f"  {s.score:5.1%}  {s.elo:5.0f}"
+        )
+    return "\n".join(lines)
+
+
+def expected_score(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def sprt_llr(wins: int, draws: int, losses: int, elo0: float, elo1: float) -> float:
+    """Approximate log likelihood ratio of H1 (the Elo difference is elo1) against H0 (it is elo0)
+    given a player's results, using a normal approximation of the mean game score. Half a game is
+    added to each outcome so a few one-sided results aren't taken as certainty."""
+    wins_, draws_, losses_ = wins + 0.5, draws + 0.5, losses + 0.5
+    n = wins_ + draws_ + losses_
+    score = (wins_ + 0.5 * draws_) / n
+    var = (wins_ * (1 - score) ** 2 + draws_ * (0.5 - score) ** 2 + losses_ * score**2) / n
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return n * (s1 - s0) * (2 * score - s0 - s1) / (2 * var)
+
+
+def sprt(
+    new: PlayerSpec,
+    base: PlayerSpec,
+    elo0: float = 0,
+    elo1: float = 10,
+    alpha: float = 0.05,
+    beta: float = 0.05,
+    max_games: int = 10000,
+    workers: Optional[int] = None,
+    pool: Optional[Executor] = None,
+    out: Optional[IO[str]] = None,
+) -> SPRTResult:
+    """Plays new against base, alternating colours, until a sequential probability ratio test
+    decides whether new is elo1 stronger (H1) or only elo0 (H0), with false positive rate alpha and
+    false negative rate beta. Games are kept running on every worker and results are written to out
+    as in run_games. Games still running when the test stops are cancelled or ignored."""
+    executor = pool or ProcessPoolExecutor(workers or os.cpu_count())
+    in_flight = 2 * (workers or os.cpu_count() or 1)
+    lower, upper = math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+    # new's wins, draws and losses
+    record = [0, 0, 0]
+    llr = 0.0
+    accepted: Optional[bool] = None
+    started = 0
+    # games in progress and whether new plays first (1) or second (-1) in them
+    running: Dict["Future[GameResult]", int] = {}
+    try:
+        while accepted is None and (running or started < max_games):
+            while len(running) < in_flight and started < max_games:
+                if started % 2 == 0:
+                    running[executor.submit(play_game, new, base)] = 1
+                else:
+                    running[executor.submit(play_game, base, new)] = -1
+                started += 1
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                record[1 - running.pop(future) * result.winner] += 1
+                if out is not None:
+                    out.write(json.dumps(result._asdict()) + "\n")
+                    out.flush()
+            llr = sprt_llr(record[0], record[1], record[2], elo0, elo1)
+            if llr >= upper:
+                accepted = True
+            elif llr <= lower:
+                accepted = False
+    finally:
+        for future in running:
+            future.cancel()
+        if pool is None:
+            executor.shutdown(cancel_futures=True)
+    return SPRTResult(accepted, llr, *record)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Play a headless round-robin tournament or SPRT match.")
+    parser.add_argument("players", nargs="+", help='player specs, e.g. rand "minimax:depth=4"')
+    parser.add_argument("--games", type=int, default=10, help="games per pair of players")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--out", default="results.jsonl", help="JSONL file of game results")
+    parser.add_argument(
+        "--sprt",
+        nargs=2,
+        type=float,
+        metavar=("ELO0", "ELO1"),
+        help="play the first player against the second until an SPRT decides between the Elo gaps",
+    )
+    args = parser.parse_args()
+
+    specs = [PlayerSpec.parse(s) for s in args.players]
+    with open(args.out, "w") as f:
+        if args.sprt is None:
+            results = run_games(schedule(specs, args.games), args.workers, out=f)
+            print(format_standings(standings(results)))
+        else:
+            if len(specs) != 2:
+                parser.error("--sprt needs exactly two players, the new one first")
+            result = sprt(
+                specs[0], specs[1], args.sprt[0], args.sprt[1], workers=args.workers, out=f
+            )
+            verdict = {True: "H1 accepted", False: "H0 accepted", None: "inconclusive"}
+            print(
+                f"{verdict[result.accepted]} after {sum(result[2:])} games: "
+                f"+{result.wins} ={result.draws} -{result.losses}, LLR {result.llr:.2f}"
+            )
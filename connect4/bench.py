@@ -0,0 +1,158 @@
+from argparse import ArgumentParser
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import math
+import platform
+import sys
+import time
+import numpy as np
+
+from connect4.board import Board, Piece
+from connect4.mcts import MCTSTree
+from connect4.minmax import minimax
+
+# seeded random columns from which the board benchmarks take a fixed 20 move game
+MOVES = np.random.default_rng(0).integers(0, Board.n_c, 200)
+# fixed opening position for the searches
+OPENING = [3, 2, 3, 4]
+
+
+def _game() -> Board:
+    """Board after the fixed game MOVES, filling columns in turn when the drawn one is full."""
+    b = Board()
+    piece = Piece.P1
+    for col in MOVES:
+        valid = b.valid_inputs
+        if not len(valid) or len(b.history) == 20:
+            break
+        b.add_piece(int(col) if col in valid else int(valid[0]), piece)
+        piece = Piece(-piece)
+    return b
+
+
+def _opening() -> Board:
+    b = Board()
+    piece = Piece.P1
+    for col in OPENING:
+        b.add_piece(col, piece)
+        piece = Piece(-piece)
+    return b
+
+
+def bench_add_piece(n: int) -> int:
+    moves = [(col, piece) for col, piece, _ in _game().history]
+    b = Board()
+    for _ in range(n):
+        for col, piece in moves:
+            b.add_piece(col, piece)
+        for _ in moves:
+            b.undo()
+    return n * len(moves)
+
+
+def bench_update(n: int) -> int:
+    moves = [(col, piece) for col, piece, _ in _game().history]
+    b = Board()
+    for _ in range(n):
+        for col, piece in moves:
+            b.update(col, piece)
+        for _ in moves:
+            b.undo()
+    return n * len(moves)
+
+
+def bench_get_win_state(n: int) -> int:
+    b = _game()
+    for _ in range(n):
+        b.get_win_state(Piece.P1)
+    return n
+
+
+def bench_valid_inputs(n: int) -> int:
+    b = _game()
+    for _ in range(n):
+        b.valid_inputs
+    return n
+
+
+def bench_minimax(depth: int) -> Callable[[int], int]:
+    def run(n: int) -> int:
+        b = _opening()
+        for _ in range(n):
+            minimax(b, depth, -math.inf, math.inf, True)
+        return n
+
+    return run
+
+
+def bench_mcts(n: int) -> int:
+    b = _opening()
+    for _ in range(n):
+        MCTSTree(seed=0).search(b, Piece.P1, 200)
+    return n * 200
+
+
+# name: (function running n repetitions and returning the number of operations, n)
+BENCHMARKS: Dict[str, Tuple[Callable[[int], int], int]] = {
+    "board.add_piece": (bench_add_piece, 2000),
+    "board.update": (bench_update, 1000),
+    "board.get_win_state": (bench_get_win_state, 100000),
+    "board.valid_inputs": (bench_valid_inputs, 100000),
+    "minimax.depth2": (bench_minimax(2), 200),
+    "minimax.depth4": (bench_minimax(4), 20),
+    "minimax.depth6": (bench_minimax(6), 3),
+    "mcts.iterations": (bench_mcts, 10),
+}
+
+
+def run(names: Optional[List[str]] = None, repeat: int = 3) -> Dict[str, float]:
+    """Operations per second of each benchmark, the best of repeat runs."""
+    results = {}
+    for name, (func, n) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        best = 0.0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ops = func(n)
+            best = max(best, ops / (time.perf_counter() - start))
+        results[name] = best
+    return results
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], tolerance: float = 0.1
+) -> List[str]:
+    """Names of the benchmarks more than tolerance (as a fraction) slower than the baseline."""
+    return [
+        name
+        for name, rate in results.items()
+        if name in baseline and rate < baseline[name] * (1 - tolerance)
+    ]
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark the board and search hot paths.")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run, from {list(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each, the best is kept")
+    parser.add_argument("--out", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="JSON file of earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed slowdown fraction")
+    args = parser.parse_args()
+
+    results = run(args.names, args.repeat)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    slower = compare(results, baseline, args.tolerance)
+    for name, rate in results.items():
+        change = f"{rate / baseline[name] - 1:+7.1%}" if name in baseline else ""
+        flag = "  REGRESSION" if name in slower else ""
+        print(f"{name:<20} {rate:14,.0f} /s {change}{flag}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            info = {"python": sys.version.split()[0], "machine": platform.machine()}
+            json.dump({"info": info, "results": results}, f, indent=2)
+    sys.exit(1 if slower else 0)
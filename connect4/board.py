@@ -1,92 +1,219 @@
-from enum import IntEnum, auto
-from typing import NamedTuple
-import numpy as np
-
-
-class Piece(IntEnum):
-    EMPTY = 0
-    P1 = 1
-    P2 = -1
-
-
-class WinState(NamedTuple):
-    is_ended: bool
-    winner: Piece
-
-
-class Board:
-    # number of rows and columns
-    n_c = 7
-    n_r = 6
-    # required length to win
-    four = 4
-
-    def __init__(self) -> None:
-        self.grid = np.full((self.n_r, self.n_c), Piece.EMPTY, dtype=Piece)
-        self.input_idx = np.zeros(self.n_c, dtype=int)
-        self.last_pos = (-1, -1)
-
-    def add_piece(self, col: int, piece: Piece) -> None:
-        """Adds a piece to the board in the selected column. Updates the column height."""
-        if col > self.n_c or col < 0:
-            raise IndexError(f"Can't put piece in column {col}.")
-        elif self.input_idx[col] >= self.n_r:
-            raise ValueError(f"Can't put piece in column {col}.")
-        else:
-            self.grid[self.input_idx[col], col] = piece
-            self.last_pos = (self.input_idx[col], col)
-            self.input_idx[col] += 1
-
-    def update(self, col: int, piece: Piece) -> WinState:
-        """Adds a piece to the board and does a check on the winstate given the new piece added.
-        Returns: Winstate"""
-        self.add_piece(col, piece)
-        return self.get_win_state(piece)
-
-    @property
-    def valid_moves(self) -> np.ndarray:
-        """Returns boolean numpy array of whether a piece can be placed in each column in the range (0,n_c-1)"""
-        return self.input_idx < self.n_r  # type: ignore
-
-    @property
-    def valid_inputs(self) -> np.ndarray:
-        """Returns numpy array of the allowed columns for piece placement in the range (0,n_c-1) inclusive."""
-        return np.arange(0, self.n_c)[np.flatnonzero(self.valid_moves)]  # type: ignore
-
-    def _is_winner(self, grid: np.ndarray) -> bool:
-        """Checks if there is a new winner given the location of the current player's pieces."""
-        r, c = self.last_pos
-        L = self.four
-        C, R = self.n_c - 1, self.n_r - 1
-
-        # check diagonals first, return if win is found
-        bottomright = min(R - r, C - c)
-        topright = min(r, C - c)
-        for i in range(
-            max(0, L - bottomright - 1), min(L - 1, r, c) + 1
-        ):  # topleft = min(r,c)
-            if all(grid[r - i + x][c - i + x] for x in range(L)):
-                return True
-
-        for i in range(
-            max(0, L - topright - 1), min(L - 1, R - r, c) + 1
-        ):  # bottomleft = min(R-r,c)
-            if all(grid[r + i - x][c - i + x] for x in range(L)):
-                return True
-
-        # otherwise check columns and rows
-        mincol, minrow = max(0, c - L + 1), max(0, r - L + 1)
-        lr = max(grid[r, i : min(i + L, C)].sum() for i in range(mincol, c + 1))
-        ud = max(grid[i : min(i + L, R), c].sum() for i in range(minrow, r + 1))
-        return lr >= L or ud >= L  # type: ignore
-
-    def get_win_state(self, player: Piece) -> WinState:
-        """Checks if someone has won and returns Winstate declaring if it has ended and who won."""
-        player_pieces = self.grid == player
-        if self._is_winner(player_pieces):
-            return WinState(True, player)
-        # Draw
-        if not self.valid_moves.any():
-            return WinState(True, Piece.EMPTY)
-        # Game is not ended yet.
-        return WinState(False, Piece.EMPTY)
+from enum import IntEnum, auto
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+
+class Piece(IntEnum):
+    EMPTY = 0
+    P1 = 1
+    P2 = -1
+
+
+class WinState(NamedTuple):
+    is_ended: bool
+    winner: Piece
+
+
+def zobrist_keys(seed: int, n: int) -> List[int]:
+    """n random 63 bit keys from a fixed seed, so hashes are the same in every process."""
+    rng = np.random.default_rng(seed)
+    return [int(k) for k in rng.integers(0, 2**63 - 1, n, dtype=np.int64)]
+
+
+def lines_of_four(n_r: int, n_c: int, four: int) -> List[List[Tuple[int, int]]]:
+    """(row, col) of the cells of every line of `four` cells on an n_r by n_c board."""
+    lines = []
+    for col in range(n_c):
+        for row in range(n_r):
+            for dc, dr in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                cells = [(row + i * dr, col + i * dc) for i in range(four)]
+                if all(0 <= r < n_r and 0 <= c < n_c for r, c in cells):
+                    lines.append(cells)
+    return lines
+
+
+class Board:
+    """Connect 4 board stored as one bitboard per player.
+
+    Each column uses n_r + 1 bits (the extra bit is a sentinel so that shifts never wrap
+    from the top of one column into the bottom of the next). Bit `c * (n_r + 1) + r` is
+    the cell at row r (counted from the bottom) of column c.
+
+    hash is a Zobrist hash of the position, updated incrementally as pieces are added and undone."""
+
+    # number of rows and columns
+    n_c = 7
+    n_r = 6
+    # required length to win
+    four = 4
+    # bits per column, including the sentinel bit
+    h1 = n_r + 1
+    # shifts for vertical, horizontal and both diagonal directions
+    _shifts = (1, h1, h1 - 1, h1 + 1)
+    # bit index of every (row, col) cell, used to materialise the grid
+    _bit_idx = np.arange(n_r)[:, None] + h1 * np.arange(n_c)[None, :]
+    # Zobrist key of each player's piece on each bit
+    zobrist = {Piece.P1: zobrist_keys(1, n_c * h1), Piece.P2: zobrist_keys(2, n_c * h1)}
+
+    def __init__(self) -> None:
+        self.bitboards: Dict[Piece, int] = {Piece.P1: 0, Piece.P2: 0}
+        self.input_idx = np.zeros(self.n_c, dtype=int)
+        self.last_pos = (-1, -1)
+        # (column, piece, previous last_pos) for every piece added, so moves can be undone
+        self.history: List[Tuple[int, Piece, Tuple[int, int]]] = []
+        self.hash = 0
+        self._grid: Optional[np.ndarray] = None
+
+    @property
+    def grid(self) -> np.ndarray:
+        """Read-only (n_r, n_c) array of Pieces, built from the bitboards on demand for renderers."""
+        if self._grid is None:
+            grid = np.full((self.n_r, self.n_c), Piece.EMPTY, dtype=Piece)
+            for piece, mask in self.bitboards.items():
+                grid[(mask >> self._bit_idx) & 1 == 1] = piece
+            # writes would only change the cache, not the bitboards
+            grid.flags.writeable = False
+            self._grid = grid
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid: np.ndarray) -> None:
+        """Rebuilds the bitboards from an (n_r, n_c) array of Pieces."""
+        self.hash = 0
+        for piece in self.bitboards:
+            bits = [int(i) for i in self._bit_idx[grid == piece]]
+            self.bitboards[piece] = sum(1 << i for i in bits)
+            for i in bits:
+                self.hash ^= self.zobrist[piece][i]
+        self._grid = None
+
+    @property
+    def mask(self) -> int:
+        """Bitboard of all occupied cells."""
+        return self.bitboards[Piece.P1] | self.bitboards[Piece.P2]
+
+    def add_piece(self, col: int, piece: Piece) -> None:
+        """Adds a piece to the board in the selected column. Updates the column height."""
+        if col > self.n_c or col < 0:
+            raise IndexError(f"Can't put piece in column {col}.")
+        elif self.input_idx[col] >= self.n_r:
+            raise ValueError(f"Can't put piece in column {col}.")
+        else:
+            row = int(self.input_idx[col])
+            bit = col * self.h1 + row
+            self.bitboards[piece] |= 1 << bit
+            self.hash ^= self.zobrist[piece][bit]
+            self.history.append((col, piece, self.last_pos))
+            self.last_pos = (row, col)
+            self.input_idx[col] += 1
+            self._grid = None
+
+    def undo(self) -> None:
+        """Removes the last piece added, restoring the column height and last position."""
+        if not self.history:
+            raise IndexError("No moves to undo.")
+        col, piece, last_pos = self.history.pop()
+        self.input_idx[col] -= 1
+        bit = col * self.h1 + int(self.input_idx[col])
+        self.bitboards[piece] ^= 1 << bit
+        self.hash ^= self.zobrist[piece][bit]
+        self.last_pos = last_pos
+        self._grid = None
+
+    def update(self, col: int, piece: Piece) -> WinState:
+        """Adds a piece to the board and does a check on the winstate given the new piece added.
+        Returns: Winstate"""
+        self.add_piece(col, piece)
+        return self.get_win_state(piece)
+
+    @property
+    def valid_moves(self) -> np.ndarray:
+        """Returns boolean numpy array of whether a piece can be placed in each column in the range (0,n_c-1)"""
+        return self.input_idx < self.n_r  # type: ignore
+
+    @property
+    def valid_inputs(self) -> np.ndarray:
+        """Returns numpy array of the allowed columns for piece placement in the range (0,n_c-1) inclusive."""
+        return np.arange(0, self.n_c)[np.flatnonzero(self.valid_moves)]  # type: ignore
+
+    def _is_winner(self, mask: int) -> bool:
+        """Checks if the bitboard contains four aligned pieces in any direction."""
+        # m has a bit set wherever a pair starts, so a pair of pairs two apart is a four.
+        for shift in self._shifts:
+            m = mask & (mask >> shift)
+            if m & (m >> 2 * shift):
+                return True
+        return False
+
+    def get_win_state(self, player: Piece) -> WinState:
+        """Checks if someone has won and returns Winstate declaring if it has ended and who won."""
+        if self._is_winner(self.bitboards[player]):
+            return WinState(True, player)
+        # Draw
+        if not self.valid_moves.any():
+            return WinState(True, Piece.EMPTY)
+        # Game is not ended yet.
+        return WinState(False, Piece.EMPTY)
+
+
+class BoardBatch:
+    """n independent games stepped together, for self-play and bulk simulation.
+
+    grid is an (n, n_r, n_c) int8 array of Pieces with row 0 at the bottom, as in Board.grid, and
+    heights the number of pieces in each column of each game. to_move is the Piece each game
+    is waiting on. Once a game is won or drawn it is marked done, its winner recorded, and
+    further moves in it are ignored."""
+
+    n_c = Board.n_c
+    n_r = Board.n_r
+    four = Board.four
+    # flat grid index of every cell of each line of four, shape (69, four)
+    _lines = np.array(
+        [[r * Board.n_c + c for r, c in line] for line in lines_of_four(n_r, n_c, four)],
+        dtype=np.intp,
+    )
+
+    def __init__(self, n: int) -> None:
+        self.grid = np.zeros((n, self.n_r, self.n_c), dtype=np.int8)
+        self.heights = np.zeros((n, self.n_c), dtype=np.int8)
+        self.to_move = np.full(n, Piece.P1, dtype=np.int8)
+        self.done = np.zeros(n, dtype=bool)
+        self.winner = np.full(n, Piece.EMPTY, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.grid)
+
+    @property
+    def valid_moves(self) -> np.ndarray:
+        """(n, n_c) boolean array of the columns each game can be played in. Empty for finished games."""
+        return (self.heights < self.n_r) & ~self.done[:, None]
+
+    def add_piece(self, cols: np.ndarray, pieces: np.ndarray) -> None:
+        """Adds pieces[i] to column cols[i] of each unfinished game."""
+        games = np.flatnonzero(~self.done)
+        cols = np.asarray(cols)[games]
+        rows = self.heights[games, cols]
+        if (rows >= self.n_r).any():
+            raise ValueError("Can't put piece in a full column.")
+        self.grid[games, rows, cols] = np.broadcast_to(pieces, len(self))[games]
+        self.heights[games, cols] += 1
+
+    def get_win_state(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Checks every line of every game. Returns whether each game has ended and who won it."""
+        sums = self.grid.reshape(len(self), -1)[:, self._lines].sum(axis=2)
+        p1 = (sums == self.four * Piece.P1).any(axis=1)
+        p2 = (sums == self.four * Piece.P2).any(axis=1)
+        winner = np.where(p1, Piece.P1, np.where(p2, Piece.P2, Piece.EMPTY)).astype(np.int8)
+        full = (self.heights >= self.n_r).all(axis=1)
+        return p1 | p2 | full, winner
+
+    def update(self, cols: np.ndarray) -> np.ndarray:
+        """Plays cols[i] for the player to move in each unfinished game, then updates which games
+        have ended and whose turn it is. Returns the done mask."""
+        self.add_piece(cols, self.to_move)
+        done, winner = self.get_win_state()
+        ended = done & ~self.done
+        self.winner[ended] = winner[ended]
+        self.done |= done
+        self.to_move[~self.done] *= -1
+        return self.done
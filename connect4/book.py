@@ -0,0 +1,121 @@
+from argparse import ArgumentParser
+from functools import lru_cache
+from typing import Dict, Optional
+import numpy as np
+
+from connect4.solver import H1, ORDER, W, Position, Solver, column_mask, winning_cells
+
+# one record per position, sorted by key
+ENTRY = np.dtype([("key", "<u8"), ("score", "i1")])
+COLUMN = (1 << H1) - 1
+
+
+def mirror(x: int) -> int:
+    """Bitboard reflected left to right."""
+    r = 0
+    for c in range(W):
+        r |= ((x >> (c * H1)) & COLUMN) << ((W - 1 - c) * H1)
+    return r
+
+
+def book_key(p: Position) -> int:
+    """Key shared by a position and its mirror image, which have the same score."""
+    key = p.key()
+    return min(key, mirror(key))
+
+
+def generate(
+    path: str, depth: int, root: Optional[Position] = None, solver: Optional[Solver] = None
+) -> int:
+    """Solves every position up to depth plies after root (the empty board by default) and writes
+    their exact scores to path, in .npy format, as ENTRY records sorted by key. Positions after a
+    game has been won are left out. Returns the number of positions written.
+
+    The solver is pure Python, so solving the first dozen or so plies takes far too long and
+    books covering them have to be generated from a root later in the game."""
+    root = root or Position()
+    solver = solver or Solver()
+    scores: Dict[int, int] = {}
+    # most plies still to explore below each position visited
+    explored: Dict[int, int] = {}
+
+    def visit(p: Position, remaining: int) -> None:
+        key = book_key(p)
+        if explored.get(key, -1) >= remaining:
+            return
+        explored[key] = remaining
+        if key not in scores:
+            scores[key] = solver.solve(p)
+        if not remaining:
+            return
+        won = winning_cells(p.current, p.mask)
+        for col in ORDER:
+            if not p.can_play(col):
+                continue
+            move = (p.mask + (1 << (col * H1))) & column_mask(col)
+            if not move & won:
+                visit(p.play(move), remaining - 1)
+
+    visit(root, depth)
+    entries = np.array(sorted(scores.items()), dtype=ENTRY)
+    # np.save adds .npy to a path without it, but the book is opened by the path as given
+    with open(path, "wb") as f:
+        np.save(f, entries)
+    return len(entries)
+
+
+class OpeningBook:
+    """Exact scores of opening positions, read from a file written by generate. The file is memory
+    mapped, so opening it is instant and processes using the same book share its pages."""
+
+    def __init__(self, path: str) -> None:
+        self.entries = np.load(path, mmap_mode="r")
+        self.keys = self.entries["key"]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, p: Position) -> Optional[int]:
+        """Score of the position for the player to move, or None if it isn't in the book."""
+        key = book_key(p)
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and int(self.keys[i]) == key:
+            return int(self.entries["score"][i])
+        return None
+
+    def best_move(self, p: Position) -> Optional[int]:
+        """Column with the best score, preferring the centre, or None unless every move is in the book."""
+        won = winning_cells(p.current, p.mask)
+        best, best_score = None, None
+        for col in ORDER:
+            if not p.can_play(col):
+                continue
+            move = (p.mask + (1 << (col * H1))) & column_mask(col)
+            if move & won:
+                return col
+            child = self.get(p.play(move))
+            if child is None:
+                return None
+            if best_score is None or -child > best_score:
+                best, best_score = col, -child
+        return best
+
+
+@lru_cache(maxsize=None)
+def open_book(path: str) -> OpeningBook:
+    """Opens each book once per process."""
+    return OpeningBook(path)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Precompute an opening book of exact scores.")
+    parser.add_argument("path", help="output .npy file")
+    parser.add_argument("--depth", type=int, default=4, help="number of plies after the root")
+    parser.add_argument("--moves", default="", help="1-indexed columns played to reach the root")
+    args = parser.parse_args()
+
+    root = Position()
+    for ch in args.moves:
+        root = root.play_col(int(ch) - 1)
+    n = generate(args.path, args.depth, root)
+    print(f"Wrote {n} positions to {args.path}")
@@ -1,20 +1,50 @@
+from typing import List, Optional, TextIO
+import sys
+import time
 import numpy as np
 
-from connect4.board import Board, Piece, WinState
-from connect4.players import Opponents
+from connect4.board import Board, Piece
+from connect4.players import Human, Opponents
 from connect4.configs import TerminalTheme
+from connect4.session import GameSession
+
+# lines printed for a board: the column numbers, the rows and a blank line
+FRAME_LINES = Board.n_r + 2
 
 
 class Terminal:
-    def __init__(self, theme: TerminalTheme) -> None:
+    """Prints the board after every move. With incremental, only the first board is printed in
+    full and later ones are drawn by moving the cursor back over the cells and column numbers
+    that changed. That relies on nothing else being printed in between, so after a human's turn
+    the next board is printed in full again.
+
+    With every set to N, the board is only shown after every Nth move, at the end of the game
+    and before a human moves, and with every=0 only a summary of the game is printed. Output
+    is buffered while a board is drawn and written to out once it is complete."""
+
+    def __init__(
+        self,
+        theme: TerminalTheme,
+        incremental: bool = False,
+        every: int = 1,
+        out: Optional[TextIO] = None,
+    ) -> None:
         super().__init__()
         self.theme = theme
+        self.incremental = incremental
+        self.every = every
+        self.out = out or sys.stdout
+        self._buffer: List[str] = []
         self._ENDC = "\033[0m"
         self._start = theme.start
         self._end = theme.end
+        self._cells = {piece: self._piece_as_str(piece) for piece in Piece}
+        # the last board drawn: its column numbers and rows, top row first
+        self._header: Optional[np.ndarray] = None
+        self._rows: Optional[np.ndarray] = None
 
     def __getitem__(self, piece: Piece) -> str:
-        return self._piece_as_str(piece)
+        return self._cells[piece]
 
     def _slots(self, valid_moves: np.ndarray) -> str:
         """Returns string of the valid columns and blank spaces in place of invalid columns"""
@@ -29,29 +59,82 @@ class Terminal:
     def _piece_as_str(self, piece: Piece) -> str:
         return f"{self.theme.back}{self.theme[piece]} {self._ENDC}"
 
+    def _at(self, line: int, col: int, text: str) -> str:
+        """Draws text over column col of a line of the last board, and returns the cursor."""
+        up = FRAME_LINES - line
+        return f"\033[{up}A\033[{3 + 2 * col}G{text}\033[{up}B\r"
+
+    def _changes(self, header: np.ndarray, rows: np.ndarray) -> str:
+        strings = []
+        for col in np.flatnonzero(header != self._header):
+            strings.append(self._at(0, int(col), str(col + 1) if header[col] else " "))
+        for row, col in zip(*np.nonzero(rows != self._rows)):
+            strings.append(self._at(1 + int(row), int(col), self[rows[row, col]]))
+        return "".join(strings)
+
+    def forget(self) -> None:
+        """Prints the next board in full."""
+        self._header = self._rows = None
+
+    def write(self, text: str) -> None:
+        """Buffers text until the next flush."""
+        self._buffer.append(text)
+
+    def flush(self) -> None:
+        self.out.write("".join(self._buffer))
+        self.out.flush()
+        self._buffer = []
+
     def update(self, board: Board) -> None:
-        strings = [self._slots(board.valid_moves)]
-        flip = np.flipud(board.grid)
-        for row in flip:
-            strings.append(self._start)
-            for item in row:
-                strings.append(self[item])
-            strings.append(self._end)
-        print("".join(strings))
-
-    def end_game(self, board: Board, winstate: WinState) -> None:
+        header, rows = board.valid_moves, np.flipud(board.grid)
+        if self.incremental and self._rows is not None:
+            self.write(self._changes(header, rows))
+        else:
+            strings = [self._slots(header)]
+            for row in rows:
+                strings.append(self._start)
+                for item in row:
+                    strings.append(self[item])
+                strings.append(self._end)
+            strings.append("\n")
+            self.write("".join(strings))
+        self._header, self._rows = header, rows
+
+    def show(self, board: Board) -> None:
+        """Draws board and writes it to out."""
         self.update(board)
-        if winstate.is_ended:
-            print(f"Player {self.theme[winstate.winner]}{self._ENDC} has just won.")
+        self.flush()
+
+    def end_game(self, session: GameSession, seconds: Optional[float] = None) -> None:
+        if self.every:
+            self.update(session.board)
+        if session.winner != Piece.EMPTY:
+            self.write(f"Player {self.theme[session.winner]}{self._ENDC} has just won.\n")
         else:
-            print("The Game is a draw.")
+            self.write("The Game is a draw.\n")
+        moves = "".join(str(col + 1) for col in session.moves)
+        timing = "" if seconds is None else f" in {seconds:.2f} s"
+        self.write(f"{len(moves)} moves{timing}: {moves}\n")
+        self.flush()
 
     def main(self, players: Opponents, b: Board):
-        winstate = WinState(False, Piece(Piece.EMPTY))
-        self.update(b)
-        while not winstate.is_ended:
-            column = players.current.get_action(b)
-            winstate = b.update(column, players.current.color)
-            self.update(b)
-            players.swap()
-        self.end_game(b, winstate)
+        session = GameSession(b, players.curr_piece)
+        start = time.perf_counter()
+        if self.every:
+            self.show(b)
+        try:
+            while not session.is_ended:
+                if isinstance(players.current, Human):
+                    if not self.every or len(session.moves) % self.every:
+                        self.show(b)
+                    # the prompt and input move the cursor away from the board
+                    self.forget()
+                session.play(players.current.get_action(b))
+                if not session.is_ended:
+                    if self.every and len(session.moves) % self.every == 0:
+                        self.show(b)
+                    players.current.ponder(b)
+                players.swap()
+        finally:
+            players.close()
+        self.end_game(session, time.perf_counter() - start)
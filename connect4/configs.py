@@ -1,5 +1,6 @@
 from pydantic import BaseModel, validator
 from pathlib import Path
+from typing import Any, Dict
 from colorama import Fore, init, Back
 import yaml
 
@@ -45,6 +46,11 @@ class CliConfig(BaseModel):
     themename: str
     player1: str
     player2: str
+    # keyword arguments for each player, e.g. {its: 5000} for mcts
+    player1_options: Dict[str, Any] = {}
+    player2_options: Dict[str, Any] = {}
+    # redraw only the cells that changed after each move
+    incremental: bool = False
 
     @validator("themename")
     def theme_validation(cls, v: str) -> str:
@@ -121,6 +127,9 @@ class PyGameConfig(BaseModel):
     screenwidth: int
     player1: str
     player2: str
+    # keyword arguments for each player, e.g. {its: 5000} for mcts
+    player1_options: Dict[str, Any] = {}
+    player2_options: Dict[str, Any] = {}
 
     @validator("themename")
     def theme_validation(cls, v: str) -> str:
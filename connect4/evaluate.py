@@ -0,0 +1,54 @@
+from typing import Dict, List, Optional
+
+from connect4.board import Board, Piece, lines_of_four
+
+
+# all 69 lines of four
+WINDOWS = [
+    [c * Board.h1 + r for r, c in line] for line in lines_of_four(Board.n_r, Board.n_c, Board.four)
+]
+# indices of the windows through each bit
+CELL_WINDOWS = [
+    [w for w, cells in enumerate(WINDOWS) if bit in cells] for bit in range(Board.n_c * Board.h1)
+]
+# value of a window holding only one player's pieces, by how many of them there are
+WEIGHTS = (0, 1, 4, 16, 64)
+
+
+class WindowEvaluator:
+    """Heuristic score of a position from Piece.P1's point of view: the sum over every window of
+    four cells still open to one player of WEIGHTS[their pieces in it], negated for Piece.P2.
+
+    The piece counts of each window and the total are updated as pieces are added and removed,
+    which must mirror the moves made on the board, so reading the score is free."""
+
+    def __init__(self, b: Optional[Board] = None) -> None:
+        self.counts: Dict[Piece, List[int]] = {
+            Piece.P1: [0] * len(WINDOWS),
+            Piece.P2: [0] * len(WINDOWS),
+        }
+        self.value = 0
+        if b is not None:
+            for piece, mask in b.bitboards.items():
+                for bit in range(Board.n_c * Board.h1):
+                    if mask >> bit & 1:
+                        self._change(bit, piece, 1)
+
+    def _change(self, bit: int, piece: Piece, step: int) -> None:
+        p1, p2 = self.counts[Piece.P1], self.counts[Piece.P2]
+        mine = self.counts[piece]
+        for w in CELL_WINDOWS[bit]:
+            # a window holding both players' pieces is worth nothing
+            if not (p1[w] and p2[w]):
+                self.value -= WEIGHTS[p1[w]] - WEIGHTS[p2[w]]
+            mine[w] += step
+            if not (p1[w] and p2[w]):
+                self.value += WEIGHTS[p1[w]] - WEIGHTS[p2[w]]
+
+    def add(self, row: int, col: int, piece: Piece) -> None:
+        """Updates the windows through the cell after piece is played there."""
+        self._change(col * Board.h1 + row, piece, 1)
+
+    def remove(self, row: int, col: int, piece: Piece) -> None:
+        """Updates the windows through the cell after piece is taken back from it."""
+        self._change(col * Board.h1 + row, piece, -1)
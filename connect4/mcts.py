@@ -0,0 +1,315 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional, Tuple
+import math
+import os
+import time
+import numpy as np
+
+from connect4.board import Board, Piece, WinState
+from connect4.rollout import random_playouts
+
+OTHER = {Piece.P1: Piece.P2, Piece.P2: Piece.P1}
+
+# names of the per-node buffers of the search tree
+FIELDS = ("visits", "value", "parent", "first_child", "n_children", "move", "piece")
+
+
+def position_key(b: Board) -> Tuple[int, int]:
+    return b.bitboards[Piece.P1], b.bitboards[Piece.P2]
+
+
+class MCTSTree:
+    """UCT search tree that is kept between moves. When searching a later position of
+    the same game, the subtree under the moves played since the last search becomes the new root.
+
+    Nodes are rows of preallocated numpy buffers (named in FIELDS) rather than Python objects.
+    A node's children are stored contiguously from first_child, and the node is reached by
+    `piece` playing in column `move`. value is the total reward from the point of view of `piece`.
+    The buffers grow by `chunk` nodes at a time, up to `max_nodes` if given, after which
+    leaves are no longer expanded. The root is always node 0.
+
+    With batch > 1 each leaf is evaluated by `batch` vectorised random playouts, which count
+    as that many visits."""
+
+    root = 0
+
+    def __init__(
+        self,
+        c: float = math.sqrt(2),
+        seed: Optional[int] = None,
+        chunk: int = 1 << 16,
+        max_nodes: Optional[int] = None,
+        batch: int = 1,
+    ) -> None:
+        self.c = c
+        self.rng = np.random.default_rng(seed)
+        self.chunk = chunk
+        self.max_nodes = max_nodes
+        self.batch = batch
+        self.size = 0
+        self.capacity = 0
+        self.visits: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.value: np.ndarray = np.zeros(0, dtype=np.float64)
+        self.parent: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.first_child: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.n_children: np.ndarray = np.zeros(0, dtype=np.int8)
+        self.move: np.ndarray = np.zeros(0, dtype=np.int8)
+        self.piece: np.ndarray = np.zeros(0, dtype=np.int8)
+        # number of moves in the board history and position key at the root
+        self.ply = 0
+        self.key: Optional[Tuple[int, int]] = None
+        self.iterations_per_second = 0.0
+        # nodes added to the tree by the last search
+        self.nodes_added = 0
+
+    @property
+    def full(self) -> bool:
+        """Whether the tree may be too full to expand another leaf."""
+        return self.max_nodes is not None and self.size + Board.n_c > self.max_nodes
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the node buffers."""
+        return sum(getattr(self, name).nbytes for name in FIELDS)
+
+    def _new_nodes(self, n: int) -> int:
+        """Reserves n contiguous nodes, growing the buffers if needed. Returns the first index."""
+        if self.size + n > self.capacity:
+            self.capacity += max(self.chunk, n)
+            for name in FIELDS:
+                setattr(self, name, np.resize(getattr(self, name), self.capacity))
+        start = self.size
+        self.size += n
+        return start
+
+    def _expand(self, node: int, b: Board) -> bool:
+        """Adds a child for every valid move of the node. Returns False if the tree is full."""
+        cols = b.valid_inputs
+        n = len(cols)
+        if self.max_nodes is not None and self.size + n > self.max_nodes:
+            return False
+        start = self._new_nodes(n)
+        end = start + n
+        self.visits[start:end] = 0
+        self.value[start:end] = 0
+        self.parent[start:end] = node
+        self.first_child[start:end] = 0
+        self.n_children[start:end] = 0
+        self.move[start:end] = cols
+        self.piece[start:end] = -self.piece[node]
+        self.first_child[node] = start
+        self.n_children[node] = n
+        return True
+
+    def _children(self, node: int) -> Tuple[int, int]:
+        start = int(self.first_child[node])
+        return start, start + int(self.n_children[node])
+
+    def _child(self, node: int, col: int) -> Optional[int]:
+        start, end = self._children(node)
+        found = np.flatnonzero(self.move[start:end] == col)
+        return start + int(found[0]) if len(found) else None
+
+    def _new_root(self, color: Piece) -> None:
+        self.size = 0
+        root = self._new_nodes(1)
+        self.visits[root] = 0
+        self.value[root] = 0
+        self.parent[root] = -1
+        self.first_child[root] = 0
+        self.n_children[root] = 0
+        self.move[root] = -1
+        self.piece[root] = OTHER[color]
+
+    def _compact(self, node: int) -> None:
+        """Moves the subtree under node to the front of the buffers, making node the root.
+        The subtree is gathered breadth first, so sibling blocks stay contiguous."""
+        frontier = np.array([node])
+        order = [frontier]
+        while True:
+            n = self.n_children[frontier].astype(np.int64)
+            first = self.first_child[frontier][n > 0].astype(np.int64)
+            n = n[n > 0]
+            if not len(n):
+                break
+            offsets = np.cumsum(n) - n
+            frontier = np.repeat(first - offsets, n) + np.arange(n.sum())
+            order.append(frontier)
+        index = np.concatenate(order)
+
+        remap = np.full(self.size, -1, dtype=np.int64)
+        remap[index] = np.arange(len(index))
+        for name in FIELDS:
+            buffer = getattr(self, name)
+            buffer[: len(index)] = buffer[index]
+        self.size = len(index)
+        parent = self.parent[: self.size]
+        parent[1:] = remap[parent[1:]]
+        parent[0] = -1
+        has_children = self.n_children[: self.size] > 0
+        first_child = self.first_child[: self.size]
+        first_child[has_children] = remap[first_child[has_children]]
+
+    def _key_before(self, b: Board, n: int) -> Tuple[int, int]:
+        """Position key of the board n moves ago. The board is restored afterwards."""
+        moves = b.history[len(b.history) - n :]
+        for _ in range(n):
+            b.undo()
+        key = position_key(b)
+        for col, piece, _ in moves:
+            b.add_piece(col, piece)
+        return key
+
+    def _reroot(self, b: Board, color: Piece) -> None:
+        """Moves the root down to the current position, or starts a new tree if it isn't in the tree."""
+        node: Optional[int] = None
+        new = len(b.history) - self.ply
+        if self.size and new >= 0 and self._key_before(b, new) == self.key:
+            node = self.root
+            for col, piece, _ in b.history[self.ply :]:
+                node = self._child(node, col)
+                if node is None or self.piece[node] != piece:
+                    node = None
+                    break
+
+        if node is None or self.piece[node] != OTHER[color]:
+            self._new_root(color)
+        elif node != self.root:
+            self._compact(node)
+        self.ply = len(b.history)
+        self.key = position_key(b)
+
+    def _rollout(self, b: Board, winstate: WinState, piece: Piece) -> Piece:
+        """Plays random moves after piece has moved until the game ends and returns the winner."""
+        n = 0
+        while not winstate.is_ended:
+            piece = OTHER[piece]
+            winstate = b.update(int(self.rng.choice(b.valid_inputs)), piece)
+            n += 1
+        for _ in range(n):
+            b.undo()
+        return winstate.winner
+
+    def _iterate(self, b: Board) -> None:
+        """One round of selection, expansion, simulation and backpropagation."""
+        node = self.root
+        path: List[int] = [node]
+        winstate = WinState(False, Piece.EMPTY)
+        while not winstate.is_ended:
+            if not self.n_children[node] and not self._expand(node, b):
+                break
+            start, end = self._children(node)
+            visits = self.visits[start:end]
+            unvisited = np.flatnonzero(visits == 0)
+            if len(unvisited):
+                node = start + int(unvisited[self.rng.integers(len(unvisited))])
+            else:
+                ucb = self.value[start:end] / visits + self.c * np.sqrt(
+                    math.log(self.visits[node]) / visits
+                )
+                node = start + int(np.argmax(ucb))
+            winstate = b.update(int(self.move[node]), Piece(int(self.piece[node])))
+            path.append(node)
+            if len(unvisited):
+                break
+
+        piece = Piece(int(self.piece[node]))
+        if self.batch > 1 and not winstate.is_ended:
+            _, draw, loss = random_playouts(b, OTHER[piece], self.batch, self.rng)
+            reward = loss + 0.5 * draw
+        else:
+            winner = self._rollout(b, winstate, piece)
+            reward = 0.5 if winner == Piece.EMPTY else float(winner == piece)
+        # reward is for the player who moved into the leaf, their opponent gets the complement
+        self.visits[path] += self.batch
+        self.value[path] += self.batch * np.where(self.piece[path] == piece, reward, 1 - reward)
+        for _ in range(len(path) - 1):
+            b.undo()
+
+    def search(self, b: Board, color: Piece, iterations: int) -> Tuple[int, float]:
+        """Runs the given number of iterations for color to move on b.
+        Returns the most visited column and its mean reward for color. The board is left unchanged."""
+        self._reroot(b, color)
+        size = self.size
+        start = time.perf_counter()
+        for _ in range(iterations):
+            self._iterate(b)
+        self.iterations_per_second = iterations / max(time.perf_counter() - start, 1e-9)
+        self.nodes_added = self.size - size
+
+        first, end = self._children(self.root)
+        best = first + int(np.argmax(self.visits[first:end]))
+        return int(self.move[best]), float(self.value[best] / self.visits[best])
+
+    def principal_variation(self) -> List[int]:
+        """Columns along the most visited path from the root."""
+        pv: List[int] = []
+        node = self.root
+        while self.size and self.n_children[node]:
+            start, end = self._children(node)
+            if not self.visits[start:end].any():
+                break
+            node = start + int(np.argmax(self.visits[start:end]))
+            pv.append(int(self.move[node]))
+        return pv
+
+
+def mcts(
+    b: Board, color: Piece, iterations: int = 1000, tree: Optional[MCTSTree] = None
+) -> Tuple[int, float]:
+    """Monte Carlo tree search for color to move on b. Pass the same tree on every turn of
+    a game to reuse the search from previous moves. Returns the chosen column and its value."""
+    if tree is None:
+        tree = MCTSTree()
+    return tree.search(b, color, iterations)
+
+
+def _root_stats(
+    b: Board, color: Piece, iterations: int, seed: int, batch: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Runs one independent search and returns the moves, visits and values of the root's children."""
+    tree = MCTSTree(seed=seed, batch=batch)
+    tree.search(b, color, iterations)
+    start, end = tree._children(tree.root)
+    return tree.move[start:end].copy(), tree.visits[start:end].copy(), tree.value[start:end].copy()
+
+
+def parallel_mcts(
+    b: Board,
+    color: Piece,
+    iterations: int = 1000,
+    workers: Optional[int] = None,
+    pool: Optional[Executor] = None,
+    seed: Optional[int] = None,
+    batch: int = 1,
+) -> Tuple[int, float]:
+    """Root-parallel Monte Carlo tree search. Each of the workers searches b from scratch for
+    `iterations` with its own seed, and their root visit counts and values are summed to choose
+    the move. A pool can be passed in to avoid starting new processes for every move.
+    Returns the chosen column and its value."""
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).generate_state(workers).tolist()
+    executor = pool or ProcessPoolExecutor(workers)
+    try:
+        results = list(
+            executor.map(
+                _root_stats,
+                repeat(b, workers),
+                repeat(color, workers),
+                repeat(iterations, workers),
+                seeds,
+                repeat(batch, workers),
+            )
+        )
+    finally:
+        if pool is None:
+            executor.shutdown()
+
+    visits = np.zeros(b.n_c)
+    values = np.zeros(b.n_c)
+    for moves, v, q in results:
+        visits[moves] += v
+        values[moves] += q
+    best = int(np.argmax(visits))
+    return best, float(values[best] / visits[best])
@@ -1,84 +1,259 @@
-from typing import Dict, Any
-import numpy as np
 from collections import namedtuple
+from enum import IntEnum
+from threading import Event
+from typing import List, NamedTuple, Optional, Tuple
 import math
-from copy import deepcopy
+import sys
+import time
 
-from connect4.board import Grid, Piece, WinState
-from connect4.score import score_by_line
-import connect4.gridref as gridref
+from connect4.board import Board, Piece, WinState
+from connect4.evaluate import WindowEvaluator
 
 
 ColScore = namedtuple("ColScore", ["c", "score"])
 
 
-class Node:
-    # update grid, declare if winner, score func, get valid inputs - make children
-    def __init__(self, grid: Grid, parent, current_player: Piece, winstate: WinState):
-        self.grid = grid
-        self.parent = parent
-        self.current_player = current_player
-        self.win_state = winstate
-        self.children: Dict[int, Any] = {}
+class SearchTimeout(Exception):
+    """Raised inside minimax when the deadline has passed."""
 
-    def change_player(self):
-        return Piece.RED if self.current_player == Piece.YELLOW else Piece.YELLOW
 
-    def score(self):
-        if self.win_state.is_ended:
-            return ColScore(
-                self.grid.last_move.c, self.get_win_state_score(self.current_player)
+class SearchStats:
+    """Counters updated by minimax: positions searched and moves that caused a beta cutoff."""
+
+    def __init__(self) -> None:
+        self.nodes = 0
+        self.cutoffs = 0
+
+
+class Bound(IntEnum):
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+
+class TTEntry(NamedTuple):
+    key: int
+    depth: int
+    score: float
+    bound: Bound
+    move: int
+
+
+# size of one entry, not counting the objects it holds
+ENTRY_BYTES = sys.getsizeof(TTEntry(0, 0, 0.0, Bound.EXACT, 0))
+
+
+class TranspositionTable:
+    """Fixed size table of search results indexed by position hash. When two positions share a
+    slot, the newer result replaces the older unless it is the same position searched less deeply."""
+
+    def __init__(self, size: int = 1 << 20) -> None:
+        self.size = size
+        self.table: List[Optional[TTEntry]] = [None] * size
+        self.probes = 0
+        self.hits = 0
+        self.filled = 0
+
+    def get(self, key: int) -> Optional[TTEntry]:
+        self.probes += 1
+        entry = self.table[key % self.size]
+        if entry is None or entry.key != key:
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, entry: TTEntry) -> None:
+        i = entry.key % self.size
+        old = self.table[i]
+        if old is None:
+            self.filled += 1
+        if old is None or old.key != entry.key or old.depth <= entry.depth:
+            self.table[i] = entry
+
+    def clear(self) -> None:
+        self.table = [None] * self.size
+        self.probes = 0
+        self.hits = 0
+        self.filled = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the table and its entries."""
+        return sys.getsizeof(self.table) + self.filled * ENTRY_BYTES
+
+
+def ordered_moves(b: Board, first: int = -1) -> List[int]:
+    """Valid columns sorted from the centre outwards, which gives earlier alpha-beta cutoffs.
+    first, if valid, is moved to the front."""
+    moves = sorted(b.valid_inputs.tolist(), key=lambda x: abs(x - b.n_c // 2))
+    if first in moves:
+        moves.remove(first)
+        moves.insert(0, first)
+    return moves
+
+
+def score(winstate: WinState, evaluator: WindowEvaluator) -> float:
+    """Scores the board from Piece.P1's point of view: P1 maximises and P2 minimises."""
+    if winstate.is_ended:
+        if winstate.winner == Piece.EMPTY:
+            return 0.0
+        return winstate.winner * math.inf
+    return evaluator.value
+
+
+def minimax(
+    b: Board,
+    depth: int,
+    alpha: float,
+    beta: float,
+    player: bool,
+    winstate: WinState = WinState(False, Piece.EMPTY),
+    tt: Optional[TranspositionTable] = None,
+    deadline: Optional[float] = None,
+    first: int = -1,
+    evaluator: Optional[WindowEvaluator] = None,
+    stats: Optional[SearchStats] = None,
+    stop: Optional[Event] = None,
+) -> ColScore:
+    """Alpha-beta search played out on a single board with make/undo moves.
+    player is True when Piece.P1 (the maximiser) is to move. The board is left unchanged.
+    If a transposition table is given, results are stored in it and reused for positions
+    reached again at the same or lower remaining depth. first is a column to try before the others.
+    Leaves are scored by evaluator, which is built from b if not given and kept in step with its moves.
+    Positions searched and cutoffs are counted in stats if given.
+    Raises SearchTimeout once time.perf_counter() passes deadline or stop is set."""
+    if evaluator is None:
+        evaluator = WindowEvaluator(b)
+    if stats is not None:
+        stats.nodes += 1
+    if winstate.is_ended or depth == 0:
+        return ColScore(b.last_pos[1], score(winstate, evaluator))
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout
+    if stop is not None and stop.is_set():
+        raise SearchTimeout
+
+    # the lowest bit distinguishes whose turn it is
+    key = b.hash ^ player
+    hint = first
+    alpha_start, beta_start = alpha, beta
+    if tt is not None:
+        entry = tt.get(key)
+        if entry is not None:
+            hint = entry.move
+            if entry.depth >= depth:
+                if entry.bound == Bound.EXACT:
+                    return ColScore(entry.move, entry.score)
+                elif entry.bound == Bound.LOWER:
+                    alpha = max(alpha, entry.score)
+                else:
+                    beta = min(beta, entry.score)
+                if beta <= alpha:
+                    return ColScore(entry.move, entry.score)
+
+    piece = Piece.P1 if player else Piece.P2
+    children = ordered_moves(b, hint)
+    best = ColScore(children[0], -math.inf if player else math.inf)
+    for child in children:
+        child_state = b.update(child, piece)
+        row = b.last_pos[0]
+        evaluator.add(row, child, piece)
+        try:
+            eval = minimax(
+                b,
+                depth - 1,
+                alpha,
+                beta,
+                not player,
+                child_state,
+                tt,
+                deadline,
+                evaluator=evaluator,
+                stats=stats,
+                stop=stop,
             )
-        lsts = gridref.get_lines(self.grid.grid)
-        score = score_by_line(lsts)
-        return ColScore(self.grid.last_move.c, score)
-
-    def make_children(self):
-        # the children are the possible moves from the current grid. The depth is how many times this iterates.
-        for col in self.grid.valid_moves():
-            grid = deepcopy(self.grid)
-            grid.update(self.current_player, col)
-            winstate = grid.get_win_state(self.current_player)
-            self.children[col] = Node(grid, self, self.change_player(), winstate)
-
-    def get_win_state_score(self, player: Piece) -> WinState:
-        state = self.grid.get_win_state(player)
-        if state.winner != Piece.EMPTY:
-            return PDICT[state.winner].score * math.inf
-        return 0
-
-    def print_grid(self):
-        # flips grid upside down and prints grid
-        print()
-        for line in np.flipud(self.grid):
-            print("|" + " ".join([PDICT[p].print for p in line]) + "|")
-
-
-def minimax(current_node: Node, depth: int, alpha: int, beta: int, player: bool):
-
-    if current_node.win_state.is_ended or depth == 0:
-        return current_node.score()
-    elif player:
-        current_node.make_children()
-        children = sorted(current_node.children, key=lambda x: abs(x - 3))
-        max_eval = ColScore(children[0], -math.inf)
-        for child in children:
-            eval = minimax(current_node.children[child], depth - 1, alpha, beta, player)
-            if eval.score > max_eval.score:
-                max_eval = ColScore(child, eval.score)
+        finally:
+            b.undo()
+            evaluator.remove(row, child, piece)
+        if player:
+            if eval.score > best.score:
+                best = ColScore(child, eval.score)
             alpha = max(alpha, eval.score)
-            if beta <= alpha:
-                break
-        return max_eval
-    else:
-        current_node.make_children()
-        children = sorted(current_node.children, key=lambda x: abs(x - 3))
-        min_eval = ColScore(children[0], math.inf)
-        for child in children:
-            eval = minimax(current_node.children[child], depth - 1, alpha, beta, True)
-            if eval.score < min_eval.score:
-                min_eval = ColScore(child, eval.score)
+        else:
+            if eval.score < best.score:
+                best = ColScore(child, eval.score)
             beta = min(beta, eval.score)
-            if beta <= alpha:
-                break
-        return min_eval
+        if beta <= alpha:
+            if stats is not None:
+                stats.cutoffs += 1
+            break
+
+    if tt is not None:
+        if best.score <= alpha_start:
+            bound = Bound.UPPER
+        elif best.score >= beta_start:
+            bound = Bound.LOWER
+        else:
+            bound = Bound.EXACT
+        tt.put(TTEntry(key, depth, best.score, bound, best.c))
+    return best
+
+
+def iterative_deepening(
+    b: Board,
+    player: bool,
+    seconds: float,
+    max_depth: Optional[int] = None,
+    tt: Optional[TranspositionTable] = None,
+    stats: Optional[SearchStats] = None,
+    stop: Optional[Event] = None,
+) -> Tuple[ColScore, int]:
+    """Runs minimax at depth 1, 2, 3... until the time budget in seconds is spent or stop is set,
+    ordering each search by the best move of the previous one. Depth 1 always completes.
+    Returns the result of the deepest completed search and its depth."""
+    deadline = time.perf_counter() + seconds
+    tt = tt if tt is not None else TranspositionTable()
+    # there is no point searching deeper than the number of empty cells
+    limit = int(b.n_r * b.n_c - b.input_idx.sum())
+    max_depth = limit if max_depth is None else min(max_depth, limit)
+
+    evaluator = WindowEvaluator(b)
+    best = minimax(b, 1, -math.inf, math.inf, player, tt=tt, evaluator=evaluator, stats=stats)
+    depth = 1
+    while depth < max_depth and not math.isinf(best.score):
+        try:
+            best = minimax(
+                b,
+                depth + 1,
+                -math.inf,
+                math.inf,
+                player,
+                tt=tt,
+                deadline=deadline,
+                first=best.c,
+                evaluator=evaluator,
+                stats=stats,
+                stop=stop,
+            )
+        except SearchTimeout:
+            break
+        depth += 1
+    return best, depth
+
+
+def principal_variation(b: Board, player: bool, tt: TranspositionTable, depth: int) -> List[int]:
+    """Expected line of play from b, following the best moves stored in the table for up to depth
+    moves. The board is left unchanged."""
+    pv: List[int] = []
+    piece = Piece.P1 if player else Piece.P2
+    for _ in range(depth):
+        entry = tt.table[(b.hash ^ player) % tt.size]
+        if entry is None or entry.key != b.hash ^ player or entry.move not in b.valid_inputs:
+            break
+        pv.append(entry.move)
+        if b.update(entry.move, piece).is_ended:
+            break
+        piece, player = Piece(-piece), not player
+    for _ in pv:
+        b.undo()
+    return pv
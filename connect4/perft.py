@@ -0,0 +1,86 @@
+from argparse import ArgumentParser
+from typing import Dict, Hashable, NamedTuple, Optional
+import time
+
+from connect4.board import Board, Piece
+from connect4.book import mirror
+
+
+class PerftCounts(NamedTuple):
+    # positions exactly depth moves ahead, games that end sooner aren't continued
+    nodes: int
+    # how many of them end the game with a win or a draw
+    wins: int
+    draws: int
+
+
+def _key(b: Board, piece: Piece, depth: int, symmetry: bool) -> Hashable:
+    if not symmetry:
+        return b.hash ^ piece, depth
+    p1, p2 = b.bitboards[Piece.P1], b.bitboards[Piece.P2]
+    return min((p1, p2), (mirror(p1), mirror(p2))), piece, depth
+
+
+def _perft(
+    b: Board, depth: int, piece: Piece, cache: Optional[Dict[Hashable, PerftCounts]], symmetry: bool
+) -> PerftCounts:
+    key = None
+    if cache is not None:
+        key = _key(b, piece, depth, symmetry)
+        if key in cache:
+            return cache[key]
+
+    nodes = wins = draws = 0
+    for col in b.valid_inputs.tolist():
+        winstate = b.update(col, piece)
+        if depth == 1:
+            nodes += 1
+            if winstate.is_ended:
+                wins += winstate.winner != Piece.EMPTY
+                draws += winstate.winner == Piece.EMPTY
+        elif not winstate.is_ended:
+            n, w, d = _perft(b, depth - 1, Piece(-piece), cache, symmetry)
+            nodes, wins, draws = nodes + n, wins + w, draws + d
+        b.undo()
+
+    counts = PerftCounts(nodes, wins, draws)
+    if cache is not None:
+        cache[key] = counts
+    return counts
+
+
+def perft(
+    b: Board, depth: int, piece: Piece = Piece.P1, hashing: bool = False, symmetry: bool = False
+) -> PerftCounts:
+    """Counts the positions reached by every sequence of depth moves from b with piece to move,
+    using Board's own move generation and win detection. The board is left unchanged.
+
+    With hashing, subtrees already counted are looked up by the Zobrist hash of the position, so
+    the result also checks that the hash is updated correctly. With symmetry, mirror image
+    positions share an entry instead. Both give the same counts as the plain search."""
+    if depth <= 0:
+        return PerftCounts(1, 0, 0)
+    return _perft(b, depth, piece, {} if hashing or symmetry else None, symmetry)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Count the positions reachable in a number of moves.")
+    parser.add_argument("depth", type=int, help="deepest number of moves to count")
+    parser.add_argument("--moves", default="", help="1-indexed columns played to reach the start")
+    parser.add_argument("--hash", action="store_true", help="reuse counts of transpositions")
+    parser.add_argument("--symmetry", action="store_true", help="reuse counts of mirror images")
+    args = parser.parse_args()
+
+    b = Board()
+    piece = Piece.P1
+    for ch in args.moves:
+        b.add_piece(int(ch) - 1, piece)
+        piece = Piece(-piece)
+    for depth in range(1, args.depth + 1):
+        start = time.perf_counter()
+        counts = perft(b, depth, piece, args.hash, args.symmetry)
+        seconds = time.perf_counter() - start
+        print(
+            f"depth {depth:2d}  nodes {counts.nodes:12,d}  wins {counts.wins:10,d}  "
+            f"draws {counts.draws:8,d}  {seconds:8.3f} s  {counts.nodes / seconds:12,.0f} nodes/s"
+        )
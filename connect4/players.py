@@ -1,38 +1,151 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from threading import Event, Thread
+import json
+import math
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
 import numpy as np
 
 from connect4.board import Piece, Board
-from connect4.mcts import mcts
+from connect4.book import OpeningBook, open_book
+from connect4.mcts import OTHER, MCTSTree, mcts, parallel_mcts
+from connect4.minmax import (
+    SearchStats,
+    SearchTimeout,
+    TranspositionTable,
+    iterative_deepening,
+    minimax,
+    principal_variation,
+)
+from connect4.solver import Position, Solver, best_column
+
+
+class SearchReport(NamedTuple):
+    """Statistics of the search behind one move. Those a player's search doesn't have are None."""
+
+    move: int
+    # the search's evaluation of the move, on the scale of the player's search
+    value: Optional[float]
+    seconds: float
+    nodes: int
+    nodes_per_second: float
+    depth: Optional[int] = None
+    tt_hit_rate: Optional[float] = None
+    cutoffs: Optional[int] = None
+    pv: List[int] = []
+    # bytes held by the search tree or transposition table
+    memory: Optional[int] = None
+    # Monte Carlo tree search iterations. Root-parallel searches don't count the nodes of their
+    # workers' trees, so their nodes are these iterations instead.
+    iterations: Optional[int] = None
+
+
+def search_report(
+    move: int, value: Optional[float], start: float, nodes: int, **stats
+) -> SearchReport:
+    """Report of a search that started at time.perf_counter() start and visited nodes positions."""
+    seconds = time.perf_counter() - start
+    return SearchReport(move, value, seconds, nodes, nodes / max(seconds, 1e-9), **stats)
 
 
 class Player(ABC):
     """A player is assigned a Piece to play with.
-    They can choose actions given list of possible actions."""
+    They can choose actions given list of possible actions.
+    Players that search keep the report of their last move in report, and append every report
+    to the file named by log as a JSON line if it is set.
+
+    Players created with ponder=True keep searching in the background after their move, while
+    the opponent thinks, and reuse that work on their next move. Subclasses that support it
+    implement _ponder and call stop_pondering before searching."""
+
+    log: Optional[str] = None
+    pondering = False
 
     def __init__(self, color: Piece):
         self.color = color
+        self.report: Optional[SearchReport] = None
+        self._ponder_thread: Optional[Thread] = None
+        self._ponder_stop = Event()
 
     @abstractmethod
     def get_action(self, b: Board) -> int:
         """Given numpy array of possible integer actions, returns selected action"""
         pass
 
+    def close(self) -> None:
+        """Releases any resources held by the player, such as worker processes"""
+        self.stop_pondering()
+
+    def ponder(self, b: Board) -> None:
+        """Starts searching b, where the opponent is to move, on a background thread until
+        stop_pondering is called. Does nothing unless the player was created with ponder=True."""
+        if not self.pondering:
+            return
+        self.stop_pondering()
+        self._ponder_stop = Event()
+        self._ponder_thread = Thread(
+            target=self._ponder, args=(deepcopy(b), self._ponder_stop), daemon=True
+        )
+        self._ponder_thread.start()
+
+    def stop_pondering(self) -> None:
+        """Stops the background search and waits for it to finish."""
+        if self._ponder_thread is not None:
+            self._ponder_stop.set()
+            self._ponder_thread.join()
+            self._ponder_thread = None
+
+    def _ponder(self, b: Board, stop: Event) -> None:
+        """Searches b with the opponent to move until stop is set."""
+        pass
+
+    def _record(self, report: SearchReport) -> None:
+        self.report = report
+        if self.log is not None:
+            with open(self.log, "a") as f:
+                f.write(json.dumps({"color": int(self.color), **report._asdict()}) + "\n")
+
 
-def create_player(name: str, p: Piece) -> Player:
+def create_player(
+    name: str, p: Piece, book: Optional[str] = None, log: Optional[str] = None, **kwargs
+) -> Player:
+    """Creates the named player. Keyword arguments are passed on to the player's constructor.
+    If book is the path of an opening book, the player plays from it while the position is in it.
+    If log is a file path, the player's search reports are appended to it."""
+    player: Player
     if name == "human":
-        return Human(p)
+        player = Human(p, **kwargs)
     elif name == "rand":
-        return Rand(p)
+        player = Rand(p, **kwargs)
     elif name == "mcts":
-        return MCTS(p)
+        player = MCTS(p, **kwargs)
+    elif name == "minimax":
+        player = Minimax(p, **kwargs)
+    elif name == "solver":
+        player = Perfect(p, **kwargs)
+    else:
+        raise ValueError(f"{name} is not a known player.")
+    if book is not None:
+        player = Booked(player, open_book(book))
+    player.log = log
+    return player
 
 
 class Opponents:
-    """Creates arena of two players. Allows the selection of the previous and current player"""
+    """Creates arena of two players. Allows the selection of the previous and current player.
+    p1_options and p2_options are keyword arguments for each player's constructor."""
 
-    def __init__(self, p1: str, p2: str) -> None:
-        self.p1 = create_player(p1, Piece.P1)
-        self.p2 = create_player(p2, Piece.P2)
+    def __init__(
+        self,
+        p1: str,
+        p2: str,
+        p1_options: Optional[Dict[str, Any]] = None,
+        p2_options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.p1 = create_player(p1, Piece.P1, **(p1_options or {}))
+        self.p2 = create_player(p2, Piece.P2, **(p2_options or {}))
 
     def swap(self) -> None:
         """Swap the players so current player is the last player etc"""
@@ -57,6 +170,10 @@ class Opponents:
     def get_action(self, b: Board) -> int:
         return self.current.get_action(b)
 
+    def close(self) -> None:
+        self.p1.close()
+        self.p2.close()
+
 
 class Human(Player):
     def __init__(self, color: Piece) -> None:
@@ -84,16 +201,193 @@ class Human(Player):
 
 
 class MCTS(Player):
-    def __init__(self, color: Piece, its=20):
+    """Monte Carlo tree search player. its is the number of iterations per move for each worker.
+    With one worker the tree is reused between moves, with more workers the search is root-parallel
+    across a process pool kept for the life of the player. batch is the number of vectorised random
+    playouts used to evaluate each leaf. The kept tree holds at most max_nodes nodes, and pondering
+    stops once it is full. After each move, value holds the chosen move's mean reward and
+    iterations_per_second the search rate."""
+
+    def __init__(
+        self, color: Piece, its=1000, workers=1, batch=1, ponder=False, max_nodes=1 << 20
+    ):
         super().__init__(color)
         self.its = its
+        # root-parallel search keeps no tree to ponder into
+        self.pondering = ponder and workers == 1
+        self.workers = workers
+        self.batch = batch
+        self.tree: Optional[MCTSTree] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        if workers > 1:
+            self.pool = ProcessPoolExecutor(workers)
+        else:
+            self.tree = MCTSTree(max_nodes=max_nodes, batch=batch)
+        self.value = 0.0
+        self.iterations_per_second = 0.0
 
     def get_action(self, b: Board) -> int:
-        """Given numpy array of possible integer actions, returns randomly selected actions"""
-        action, value = mcts(b, self.color, iterations=self.its)
-        print(value)
+        """Runs Monte Carlo tree search and returns the best action"""
+        self.stop_pondering()
+        start = time.perf_counter()
+        iterations = self.its * self.workers
+        if self.tree is not None:
+            action, value = mcts(b, self.color, iterations=self.its, tree=self.tree)
+            pv = self.tree.principal_variation()
+            report = search_report(
+                action,
+                value,
+                start,
+                self.tree.nodes_added,
+                depth=len(pv),
+                pv=pv,
+                memory=self.tree.nbytes,
+                iterations=iterations,
+            )
+        else:
+            action, value = parallel_mcts(
+                b, self.color, self.its, self.workers, pool=self.pool, batch=self.batch
+            )
+            report = search_report(
+                action, value, start, iterations, pv=[action], iterations=iterations
+            )
+        self.value = value
+        self.iterations_per_second = iterations / max(report.seconds, 1e-9)
+        self._record(report)
+        return action
+
+    def _ponder(self, b: Board, stop: Event) -> None:
+        """Grows the tree from the opponent's turn, so the subtree under their move is kept"""
+        assert self.tree is not None
+        while not stop.is_set():
+            self.tree.search(b, OTHER[self.color], 64)
+            if self.tree.full:
+                break
+
+    def close(self) -> None:
+        """Shuts down the worker processes"""
+        super().close()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+class Minimax(Player):
+    """Alpha-beta minimax player. Without a time budget it searches depth moves ahead (5 by default),
+    with seconds set it deepens iteratively until the budget is spent, up to depth if given.
+    Pondering fills the transposition table with results for the opponent's position."""
+
+    def __init__(self, color: Piece, depth=None, tt_size=1 << 20, seconds=None, ponder=False):
+        super().__init__(color)
+        self.pondering = ponder
+        self.depth = 5 if depth is None and seconds is None else depth
+        self.seconds = seconds
+        self.tt = TranspositionTable(tt_size)
+
+    def get_action(self, b: Board) -> int:
+        """Searches with alpha-beta minimax and returns the best column"""
+        self.stop_pondering()
+        player = self.color == Piece.P1
+        start = time.perf_counter()
+        stats = SearchStats()
+        probes, hits = self.tt.probes, self.tt.hits
+        if self.seconds is None:
+            result = minimax(b, self.depth, -math.inf, math.inf, player, tt=self.tt, stats=stats)
+            depth = self.depth
+        else:
+            result, depth = iterative_deepening(
+                b, player, self.seconds, self.depth, tt=self.tt, stats=stats
+            )
+        probes, hits = self.tt.probes - probes, self.tt.hits - hits
+        report = search_report(
+            int(result.c),
+            result.score,
+            start,
+            stats.nodes,
+            depth=depth,
+            tt_hit_rate=hits / probes if probes else 0.0,
+            cutoffs=stats.cutoffs,
+            pv=principal_variation(b, player, self.tt, depth),
+            memory=self.tt.nbytes,
+        )
+        self._record(report)
+        return int(result.c)
+
+    def _ponder(self, b: Board, stop: Event) -> None:
+        iterative_deepening(b, self.color != Piece.P1, math.inf, tt=self.tt, stop=stop)
+
+
+class Perfect(Player):
+    """Plays perfectly using the negamax solver, keeping its transposition table between moves.
+    The solver gets up to seconds per move. Early in the game, where a pure Python solve takes far
+    longer, the move comes from iterative deepening minimax given fallback_seconds instead."""
+
+    def __init__(self, color: Piece, tt_size=(1 << 20) + 7, seconds=1.0, fallback_seconds=0.5):
+        super().__init__(color)
+        self.solver = Solver(tt_size)
+        self.seconds = seconds
+        self.fallback_seconds = fallback_seconds
+        self.tt = TranspositionTable(1 << 16)
+
+    def get_action(self, b: Board) -> int:
+        """Returns the column with the best exact score, or the minimax choice if solving runs out of time"""
+        start = time.perf_counter()
+        deadline = None if self.seconds is None else start + self.seconds
+        nodes = self.solver.nodes
+        try:
+            scores = self.solver.analyse(Position.from_board(b, self.color), deadline=deadline)
+        except SearchTimeout:
+            player = self.color == Piece.P1
+            stats = SearchStats()
+            result, depth = iterative_deepening(
+                b, player, self.fallback_seconds, tt=self.tt, stats=stats
+            )
+            report = search_report(
+                int(result.c),
+                result.score,
+                start,
+                self.solver.nodes - nodes + stats.nodes,
+                depth=depth,
+                cutoffs=stats.cutoffs,
+                pv=principal_variation(b, player, self.tt, depth),
+                memory=self.solver.nbytes + self.tt.nbytes,
+            )
+        else:
+            action = best_column(scores)
+            report = search_report(
+                action, scores[action], start, self.solver.nodes - nodes, memory=self.solver.nbytes
+            )
+        self._record(report)
+        return report.move
+
+
+class Booked(Player):
+    """Plays the best move from an opening book, and leaves positions outside it to player."""
+
+    def __init__(self, player: Player, book: OpeningBook) -> None:
+        super().__init__(player.color)
+        self.player = player
+        self.book = book
+
+    def get_action(self, b: Board) -> int:
+        # the wrapped player would otherwise keep pondering through a move from the book
+        self.player.stop_pondering()
+        start = time.perf_counter()
+        action = self.book.best_move(Position.from_board(b, self.color))
+        if action is None:
+            action = self.player.get_action(b)
+            if self.player.report is not None:
+                self._record(self.player.report)
+        else:
+            self._record(search_report(action, None, start, 0, depth=0, pv=[action]))
         return action
 
+    def ponder(self, b: Board) -> None:
+        self.player.ponder(b)
+
+    def close(self) -> None:
+        self.player.close()
+
 
 class Rand(Player):
     def __init__(self, color: Piece):
@@ -0,0 +1,54 @@
+from typing import Optional, Tuple
+import numpy as np
+
+from connect4.board import Board, Piece
+
+# bit offset of the bottom cell of each column
+COLUMN_BITS = np.arange(Board.n_c) * Board.h1
+
+
+def is_winner(masks: np.ndarray) -> np.ndarray:
+    """Vectorised Board._is_winner over an array of uint64 bitboards."""
+    won = np.zeros(len(masks), dtype=bool)
+    for shift in Board._shifts:
+        m = masks & (masks >> np.uint64(shift))
+        won |= (m & (m >> np.uint64(2 * shift))) != 0
+    return won
+
+
+def random_playouts(
+    b: Board, to_move: Piece, n: int, rng: Optional[np.random.Generator] = None
+) -> Tuple[float, float, float]:
+    """Plays n uniformly random games to the end from b with to_move playing first.
+    All games are stepped together as arrays of bitboards and column heights.
+    Returns the fractions of games won, drawn and lost by to_move."""
+    rng = rng or np.random.default_rng()
+    mover = np.full(n, b.bitboards[to_move], dtype=np.uint64)
+    waiting = np.full(n, b.bitboards[Piece(-to_move)], dtype=np.uint64)
+    heights = np.tile(np.asarray(b.input_idx, dtype=np.int64), (n, 1))
+    # +1 if to_move wins the game, -1 if they lose, 0 for a draw
+    result = np.zeros(n, dtype=np.int8)
+    active = np.arange(n)
+    sign = 1
+    while len(active):
+        h = heights[active]
+        legal = h < b.n_r
+        # games without a legal move are drawn
+        playable = legal.any(axis=1)
+        active, h, legal = active[playable], h[playable], legal[playable]
+        if not len(active):
+            break
+
+        # a random legal column for each game: the largest of uniform draws over legal columns
+        col = np.argmax(rng.random(legal.shape) * legal, axis=1)
+        row = h[np.arange(len(active)), col]
+        heights[active, col] += 1
+        mover[active] |= np.left_shift(np.uint64(1), (COLUMN_BITS[col] + row).astype(np.uint64))
+
+        won = is_winner(mover[active])
+        result[active[won]] = sign
+        active = active[~won]
+        mover, waiting = waiting, mover
+        sign = -sign
+
+    return float(np.mean(result == 1)), float(np.mean(result == 0)), float(np.mean(result == -1))
@@ -0,0 +1,248 @@
+from argparse import ArgumentParser
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import suppress
+from multiprocessing import get_context
+from typing import Any, Dict, List, Mapping, Optional, Set
+import asyncio
+import json
+import os
+
+from connect4.arena import PlayerSpec
+from connect4.board import Piece
+from connect4.players import create_player
+from connect4.session import GameSession
+
+# longest message a client may send, in bytes
+LINE_LIMIT = 1024
+
+# engines clients may play against and the options they may set. Anything else, such as a log
+# file, an opening book, pondering or extra worker processes, is refused.
+ENGINE_OPTIONS = {
+    "rand": (),
+    "mcts": ("its", "batch"),
+    "minimax": ("depth", "seconds", "tt_size"),
+    "solver": ("seconds", "fallback_seconds", "tt_size"),
+}
+
+# largest value the server allows for each option, larger values are lowered to it
+OPTION_LIMITS: Dict[str, float] = {
+    "its": 20000,
+    "batch": 64,
+    "depth": 8,
+    "seconds": 5.0,
+    "fallback_seconds": 5.0,
+    "tt_size": 1 << 22,
+}
+
+# options that may be fractional, the others are counts and must be whole numbers
+FLOAT_OPTIONS = ("seconds", "fallback_seconds")
+
+
+def allowed_spec(spec: PlayerSpec, limits: Mapping[str, float] = OPTION_LIMITS) -> PlayerSpec:
+    """spec with its options clamped to limits. Raises ValueError if the engine or any of its
+    options isn't in ENGINE_OPTIONS, or an option isn't a positive number, or a positive integer
+    for options not in FLOAT_OPTIONS."""
+    if spec.name not in ENGINE_OPTIONS:
+        raise ValueError(f"{spec.name} is not an opponent the server offers.")
+    options = {}
+    for key, value in spec.options.items():
+        if key not in ENGINE_OPTIONS[spec.name]:
+            raise ValueError(f"Option {key} is not allowed for {spec.name}.")
+        types = (int, float) if key in FLOAT_OPTIONS else int
+        if isinstance(value, bool) or not isinstance(value, types) or value <= 0:
+            kind = "number" if key in FLOAT_OPTIONS else "integer"
+            raise ValueError(f"Option {key} must be a positive {kind}.")
+        options[key] = min(value, type(value)(limits[key]))
+    return spec._replace(options=options)
+
+
+def engine_move(spec: PlayerSpec, moves: List[int]) -> int:
+    """Column the engine described by spec plays after moves. Runs in a worker process, so the
+    engine is created for every move and any worker can serve any session."""
+    session = GameSession.from_moves(moves)
+    player = create_player(spec.name, session.to_move, **spec.options)
+    try:
+        return player.get_action(session.board)
+    finally:
+        player.close()
+
+
+class GameServer:
+    """Serves games against the engines over TCP, many at once on one event loop.
+
+    Messages are JSON objects, one per line. A client opens a game with
+    {"opponent": "minimax:depth=4", "first": true}, the opponent given as for PlayerSpec.parse.
+    On each of its turns the server sends {"moves": [...], "to_move": piece, "valid": [...]} and the
+    client replies {"move": column}, with columns counted from 0. A move that can't be played gets
+    {"error": message} and the state again. The game ends with {"moves": [...], "winner": piece},
+    winner being 0 for a draw, or {"error": message} if the session is dropped.
+
+    Only the engines and options in ENGINE_OPTIONS are offered, with the options lowered to limits
+    (OPTION_LIMITS by default). Engine moves run in a process pool, with at most max_searches of
+    them submitted at a time so the pool's queue stays bounded and sessions wait their turn for a
+    worker. A search already running when its session is dropped still finishes, and keeps its
+    place among the max_searches until it does. Connections beyond max_sessions are turned away,
+    each write waits for the client to read, and a session is dropped if the client takes longer
+    than timeout seconds to send a message or the whole game takes longer than game_timeout."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_sessions: int = 1000,
+        max_searches: Optional[int] = None,
+        timeout: float = 60.0,
+        game_timeout: Optional[float] = None,
+        pool: Optional[Executor] = None,
+        limits: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        workers = workers or os.cpu_count() or 1
+        # forked workers would hold on to copies of the client sockets open when they started,
+        # keeping those connections open after the server closes them
+        self.pool = pool or ProcessPoolExecutor(workers, mp_context=get_context("spawn"))
+        self._own_pool = pool is None
+        self.max_sessions = max_sessions
+        self.timeout = timeout
+        self.game_timeout = game_timeout
+        self.limits = OPTION_LIMITS if limits is None else limits
+        self._searches = asyncio.Semaphore(max_searches or 2 * workers)
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self.server: Optional[asyncio.Server] = None
+
+    @property
+    def sessions(self) -> int:
+        """Number of connected clients."""
+        return len(self._writers)
+
+    @property
+    def port(self) -> int:
+        assert self.server is not None
+        return int(self.server.sockets[0].getsockname()[1])
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Starts listening. Port 0 picks a free port, which is then in port."""
+        self.server = await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+
+    async def close(self) -> None:
+        """Stops listening, drops the open sessions and shuts down the pool if it was made here."""
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self.server.wait_closed()
+        if self._own_pool:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Plays one game with the client connected by reader and writer."""
+        try:
+            if self.sessions >= self.max_sessions:
+                await self._send(writer, {"error": "The server is full."})
+                return
+            self._writers.add(writer)
+            try:
+                await asyncio.wait_for(self._play(reader, writer), self.game_timeout)
+            except asyncio.TimeoutError:
+                await self._send(writer, {"error": "The session timed out."})
+            except (TypeError, ValueError) as e:
+                # unreadable messages, unknown opponents and bad options for them
+                await self._send(writer, {"error": str(e)})
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _play(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        request = await self._receive(reader)
+        spec = allowed_spec(PlayerSpec.parse(str(request.get("opponent", ""))), self.limits)
+        engine = Piece.P2 if request.get("first", True) else Piece.P1
+        session = GameSession()
+        while not session.is_ended:
+            if session.to_move == engine:
+                session.play(await self._engine_move(spec, session.moves))
+                continue
+            await self._send(
+                writer,
+                {
+                    "moves": session.moves,
+                    "to_move": int(session.to_move),
+                    "valid": session.board.valid_inputs.tolist(),
+                },
+            )
+            message = await self._receive(reader)
+            try:
+                session.play(int(message["move"]))
+            except (KeyError, TypeError, ValueError) as e:
+                await self._send(writer, {"error": f"Invalid move: {e}"})
+        await self._send(writer, {"moves": session.moves, "winner": int(session.winner)})
+
+    async def _engine_move(self, spec: PlayerSpec, moves: List[int]) -> int:
+        await self._searches.acquire()
+        loop = asyncio.get_running_loop()
+        search = loop.run_in_executor(self.pool, engine_move, spec, list(moves))
+        # the worker can't be stopped, so its slot is only freed once it has finished, even if
+        # the session is dropped first
+        search.add_done_callback(self._search_done)
+        return await asyncio.shield(search)
+
+    def _search_done(self, search: "asyncio.Future[int]") -> None:
+        self._searches.release()
+        if not search.cancelled():
+            # retrieved so a dropped session's failed search isn't reported as never retrieved
+            search.exception()
+
+    async def _receive(self, reader: asyncio.StreamReader) -> Dict[str, Any]:
+        """Next message from the client. Raises ConnectionError if it disconnects, and ValueError if
+        it sends nothing for timeout seconds or the message isn't a JSON object."""
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.timeout)
+        except asyncio.TimeoutError:
+            raise ValueError("Timed out waiting for the client.")
+        if not line:
+            raise ConnectionError("The client disconnected.")
+        message = json.loads(line)
+        if not isinstance(message, dict):
+            raise ValueError("Messages must be JSON objects.")
+        return message
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, message: Dict[str, Any]) -> None:
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+
+async def serve(host: str, port: int, **kwargs) -> None:
+    """Runs a GameServer until cancelled. Keyword arguments are passed on to GameServer."""
+    server = GameServer(**kwargs)
+    await server.start(host, port)
+    print(f"Serving Connect 4 on {host}:{server.port}")
+    try:
+        assert server.server is not None
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Serve games against the engines over TCP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="engine worker processes")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="most games at once")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds a client may idle")
+    parser.add_argument("--game-timeout", type=float, default=None, help="seconds a game may last")
+    args = parser.parse_args()
+
+    with suppress(KeyboardInterrupt):
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                workers=args.workers,
+                max_sessions=args.max_sessions,
+                timeout=args.timeout,
+                game_timeout=args.game_timeout,
+            )
+        )
@@ -0,0 +1,43 @@
+from typing import List, Optional
+
+from connect4.board import Board, Piece, WinState
+
+
+class GameSession:
+    """State of one game, independent of how it is shown or who is playing: the board, the piece to
+    move, the columns played so far and whether the game has ended. Front ends ask their players
+    for a column and pass it to play."""
+
+    def __init__(self, b: Optional[Board] = None, to_move: Piece = Piece.P1) -> None:
+        self.board = b or Board()
+        self.to_move = to_move
+        self.winstate = WinState(False, Piece(Piece.EMPTY))
+        self.moves: List[int] = []
+
+    @classmethod
+    def from_moves(cls, moves: List[int]) -> "GameSession":
+        """Session after playing the columns in moves from the empty board."""
+        session = cls()
+        for col in moves:
+            session.play(col)
+        return session
+
+    @property
+    def is_ended(self) -> bool:
+        return self.winstate.is_ended
+
+    @property
+    def winner(self) -> Piece:
+        return self.winstate.winner
+
+    def play(self, col: int) -> WinState:
+        """Plays the piece to move in col and passes the turn to the other piece.
+        Raises ValueError if the game has ended or col can't be played."""
+        if self.is_ended:
+            raise ValueError("The game has ended.")
+        if col not in self.board.valid_inputs:
+            raise ValueError(f"Can't put piece in column {col}.")
+        self.winstate = self.board.update(col, self.to_move)
+        self.moves.append(col)
+        self.to_move = Piece(-self.to_move)
+        return self.winstate
@@ -0,0 +1,237 @@
+from typing import List, Optional, Tuple
+import sys
+import time
+
+from connect4.board import Board, Piece
+from connect4.minmax import SearchTimeout
+
+W, H = Board.n_c, Board.n_r
+H1 = Board.h1
+SIZE = W * H
+BOTTOM = sum(1 << (c * H1) for c in range(W))
+FULL = BOTTOM * ((1 << H) - 1)
+# column order for exploring moves, from the centre outwards
+ORDER = sorted(range(W), key=lambda c: abs(c - W // 2))
+
+
+def column_mask(col: int) -> int:
+    return ((1 << H) - 1) << (col * H1)
+
+
+def popcount(x: int) -> int:
+    return bin(x).count("1")
+
+
+def winning_cells(position: int, mask: int) -> int:
+    """Empty cells which would complete four for the player with the pieces in position."""
+    # vertical
+    r = (position << 1) & (position << 2) & (position << 3)
+    # horizontal and both diagonals: the three other cells may lie either side of the empty one
+    for s in (H1, H, H + 2):
+        p = (position << s) & (position << 2 * s)
+        r |= p & (position << 3 * s)
+        r |= p & (position >> s)
+        p = (position >> s) & (position >> 2 * s)
+        r |= p & (position << s)
+        r |= p & (position >> 3 * s)
+    return r & (FULL ^ mask)
+
+
+class Position:
+    """Position from the point of view of the player to move. current is a bitboard of their
+    pieces, mask of all pieces, and moves the number of pieces played. Uses the Board bit layout."""
+
+    __slots__ = ("current", "mask", "moves")
+
+    def __init__(self, current: int = 0, mask: int = 0, moves: int = 0) -> None:
+        self.current = current
+        self.mask = mask
+        self.moves = moves
+
+    @classmethod
+    def from_board(cls, b: Board, to_move: Piece) -> "Position":
+        mask = b.mask
+        return cls(b.bitboards[to_move], mask, popcount(mask))
+
+    def key(self) -> int:
+        """Unique key of the position, current + mask has a single bit above each column's pieces."""
+        return self.current + self.mask
+
+    def possible(self) -> int:
+        """Bitboard of the cells where a piece can be played."""
+        return (self.mask + BOTTOM) & FULL
+
+    def can_play(self, col: int) -> bool:
+        return not self.mask & (1 << (col * H1 + H - 1))
+
+    def play(self, move: int) -> "Position":
+        """Returns the position after the player to move plays the single bit move."""
+        return Position(self.current ^ self.mask, self.mask | move, self.moves + 1)
+
+    def play_col(self, col: int) -> "Position":
+        return self.play((self.mask + (1 << (col * H1))) & column_mask(col))
+
+    def can_win_next(self) -> bool:
+        return bool(winning_cells(self.current, self.mask) & self.possible())
+
+    def non_losing_moves(self) -> int:
+        """Bitboard of possible moves that don't let the opponent win straight away.
+        Empty if the opponent has two threats that can't both be blocked."""
+        possible = self.possible()
+        opponent_win = winning_cells(self.current ^ self.mask, self.mask)
+        forced = possible & opponent_win
+        if forced:
+            if forced & (forced - 1):
+                return 0
+            possible = forced
+        # don't play directly under an opponent's winning cell
+        return possible & ~(opponent_win >> 1)
+
+    def move_score(self, move: int) -> int:
+        """Number of winning cells the player to move would have after playing move."""
+        return popcount(winning_cells(self.current | move, self.mask))
+
+
+class Solver:
+    """Perfect play Connect 4 solver: negamax with alpha-beta pruning, centre-first and
+    threat-based move ordering, null-window search and a transposition table of upper bounds.
+
+    Scores are from the point of view of the player to move. 0 is a draw, a positive score
+    means they win and a negative one that they lose. The sooner the win, the larger the score:
+    winning with your k-th remaining piece scores (n_r * n_c + 1 - moves) // 2 - k + 1.
+
+    Being pure Python, positions late in the game solve in milliseconds but the first dozen or so
+    plies can take minutes or longer. Searches can be given a deadline and raise SearchTimeout
+    once it passes."""
+
+    def __init__(self, tt_size: int = (1 << 20) + 7) -> None:
+        self.tt_size = tt_size
+        self.deadline: Optional[float] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Empties the transposition table of upper bounds and resets the node count."""
+        self.tt_keys: List[int] = [-1] * self.tt_size
+        self.tt_values: List[int] = [0] * self.tt_size
+        self.nodes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the transposition table."""
+        return sys.getsizeof(self.tt_keys) + sys.getsizeof(self.tt_values)
+
+    def _negamax(self, p: Position, alpha: int, beta: int) -> int:
+        """Score of p if it is within (alpha, beta), otherwise a bound beyond the window.
+        Assumes the player to move can't win straight away."""
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        moves = p.non_losing_moves()
+        if not moves:
+            return -((SIZE - p.moves) // 2)
+        if p.moves >= SIZE - 2:
+            return 0
+
+        # the opponent can't win with their next piece, so the lowest score is one move later
+        lower = -((SIZE - 2 - p.moves) // 2)
+        if alpha < lower:
+            alpha = lower
+            if alpha >= beta:
+                return alpha
+        # we can't win with our next piece either
+        upper = (SIZE - 1 - p.moves) // 2
+        key = p.key()
+        i = key % self.tt_size
+        if self.tt_keys[i] == key:
+            upper = self.tt_values[i]
+        if beta > upper:
+            beta = upper
+            if alpha >= beta:
+                return beta
+
+        # moves creating the most threats first, then centre first
+        ordered: List[Tuple[int, int, int]] = []
+        for col in ORDER:
+            move = moves & column_mask(col)
+            if move:
+                ordered.append((-p.move_score(move), len(ordered), move))
+        ordered.sort()
+
+        for _, _, move in ordered:
+            score = -self._negamax(p.play(move), -beta, -alpha)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        self.tt_keys[i] = key
+        self.tt_values[i] = alpha
+        return alpha
+
+    def solve(self, p: Position, weak: bool = False) -> int:
+        """Exact score of the position. With weak only the result is found: 1, 0 or -1 for a
+        win, draw or loss."""
+        if p.can_win_next():
+            return 1 if weak else (SIZE + 1 - p.moves) // 2
+        lower = -((SIZE - p.moves) // 2)
+        upper = (SIZE + 1 - p.moves) // 2
+        if weak:
+            lower, upper = -1, 1
+        # narrow the bounds with null-window searches, probing near zero first
+        while lower < upper:
+            med = lower + (upper - lower) // 2
+            if med <= 0 and int(lower / 2) < med:
+                med = int(lower / 2)
+            elif med >= 0 and int(upper / 2) > med:
+                med = int(upper / 2)
+            r = self._negamax(p, med, med + 1)
+            if r <= med:
+                upper = r
+            else:
+                lower = r
+        # fail-soft searches can return scores beyond the weak window
+        return max(-1, min(1, lower)) if weak else lower
+
+    def analyse(
+        self, p: Position, weak: bool = False, deadline: Optional[float] = None
+    ) -> List[Optional[int]]:
+        """Score for the player to move of playing in each column, None for full columns.
+        Raises SearchTimeout if time.perf_counter() passes deadline before all columns are solved."""
+        scores: List[Optional[int]] = [None] * W
+        self.deadline = deadline
+        try:
+            for col in range(W):
+                if not p.can_play(col):
+                    continue
+                move = (p.mask + (1 << (col * H1))) & column_mask(col)
+                if winning_cells(p.current, p.mask) & move:
+                    scores[col] = 1 if weak else (SIZE + 1 - p.moves) // 2
+                else:
+                    scores[col] = -self.solve(p.play(move), weak)
+        finally:
+            self.deadline = None
+        return scores
+
+    def best_move(self, p: Position, deadline: Optional[float] = None) -> int:
+        """Column with the best score, preferring the centre between equal scores."""
+        return best_column(self.analyse(p, deadline=deadline))
+
+
+def best_column(scores: List[Optional[int]]) -> int:
+    """Column with the best of the scores given by Solver.analyse, preferring the centre."""
+    best, best_score = -1, None
+    for col in ORDER:
+        score = scores[col]
+        if score is not None and (best_score is None or score > best_score):
+            best, best_score = col, score
+    return best
+
+
+def moves_to_end(p: Position, score: int) -> Optional[int]:
+    """Number of pieces the player to move plays before the game is decided with the given
+    score (by their win, or by their last piece before losing). None for a draw."""
+    if score > 0:
+        return (SIZE + 1 - p.moves) // 2 - score + 1
+    elif score < 0:
+        return (SIZE - p.moves) // 2 + score + 1
+    return None
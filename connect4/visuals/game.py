@@ -1,22 +1,31 @@
 import pygame as pg
-from pygame import KEYDOWN, QUIT, MOUSEBUTTONDOWN, MOUSEMOTION, VIDEORESIZE
+from pygame import KEYDOWN, QUIT, MOUSEBUTTONDOWN, MOUSEMOTION, VIDEORESIZE, WINDOWEXPOSED
 from pygame.event import Event, post
+from copy import deepcopy
+from threading import Thread
 import os
 
-from connect4.board import Board, Piece, WinState
+from connect4.board import Board
 from connect4.players import Opponents
+from connect4.session import GameSession
 from connect4.visuals.text import TextHandler
 from connect4.visuals.theme import PygameTheme
-from connect4.visuals.tokens import Sprites
+from connect4.visuals.tokens import Sprites, clear_token_images
 from connect4.visuals.screen import Screen, WIDTH, UNIT
 
 AI_TURN = pg.event.custom_type()
+AI_MOVE = pg.event.custom_type()
+AI_ERROR = pg.event.custom_type()
 END_GAME = pg.event.custom_type()
 INVALID_COL = pg.event.custom_type()
 TOKEN_ANIM = pg.event.custom_type()
 PLAYER_TURN = pg.event.custom_type()
 
 
+# pause before the AI starts searching, so its move doesn't land on top of the human's
+AI_DELAY = 400
+
+
 def col_from_pos(p: int) -> int:
     return int(p // UNIT)
 
@@ -25,12 +34,13 @@ class PyGame:
     def __init__(
         self, players: Opponents, theme: PygameTheme, scale=0.4, fps=10
     ) -> None:
-        self.board = Board()
+        self.session = GameSession(Board(), players.curr_piece)
         self.thm = theme
         self.players = players
         self.fps = fps
-        self.winstate = WinState(False, Piece(Piece.EMPTY))
         self.running = True
+        # True while the AI is searching on its worker thread
+        self.thinking = False
 
         os.environ["SDL_VIDEO_CENTERED"] = "1"
         pg.init()
@@ -38,6 +48,8 @@ class PyGame:
         self.clock = pg.time.Clock()
 
         self.screen = Screen(theme.background, theme.board, scale)
+        # tokens rendered for another theme won't be used again
+        clear_token_images()
         self.textrenderer = TextHandler(
             (5, 10),
             theme.f_family,
@@ -59,41 +71,65 @@ class PyGame:
         return self.thm[self.players.curr_piece]
 
     def player_turn(self, action: int):
-        self.winstate = self.board.update(action, self.players.curr_piece)
-        self.sprites.add_token(self.board.last_pos, self.current_color)
-        self.sprites.move_marker(self.board.last_pos)
-        if self.winstate.is_ended:
+        self.session.play(action)
+        self.sprites.add_token(self.session.board.last_pos, self.current_color)
+        self.sprites.move_marker(self.session.board.last_pos)
+        if self.session.is_ended:
             post(Event(END_GAME))
         self.players.swap()
 
         self.textrenderer.prompt_and_blit(
-            self.screen, self.board.valid_inputs, self.players.curr_piece
+            self.screen, self.session.board.valid_inputs, self.players.curr_piece
         )
 
     def human_turn(self, a):
-        if a not in self.board.valid_inputs:
+        if self.thinking or self.session.is_ended:
+            return
+        if a not in self.session.board.valid_inputs:
             post(Event(INVALID_COL, {"col": a}))
             return
 
         self.player_turn(a)
-        if not self.winstate.is_ended:
-            self.last = pg.time.get_ticks()
+        if not self.session.is_ended:
+            self.thinking = True
             self.sprites.kill_hovertoken()
-            post(Event(AI_TURN))
+            pg.time.set_timer(AI_TURN, AI_DELAY, 1)
 
     def ai_turn(self):
-        now = pg.time.get_ticks()
-        if now - self.last < 400:
-            pg.event.post(Event(AI_TURN))
-            return
-
-        a = self.players.get_action(self.board)
+        """Starts the AI's search on a worker thread, which posts AI_MOVE with its column,
+        or AI_ERROR with the message if the search fails"""
+        player, board = self.players.current, deepcopy(self.session.board)
+
+        def search():
+            try:
+                col = player.get_action(board)
+            except Exception as e:
+                post(Event(AI_ERROR, {"error": str(e) or type(e).__name__}))
+            else:
+                post(Event(AI_MOVE, {"col": col}))
+
+        Thread(target=search, daemon=True).start()
+
+    def ai_move(self, a):
+        self.thinking = False
         self.player_turn(a)
-        self.sprites.add_hovertoken(self.current_color)
+        if not self.session.is_ended:
+            self.sprites.add_hovertoken(self.current_color)
+            # the AI, now the next player, thinks during the human's turn
+            self.players.next.ponder(self.session.board)
+
+    def ai_error(self, error: str) -> None:
+        """Shows why the AI couldn't move and stops the game, leaving the window open"""
+        self.thinking = False
+        self.textrenderer.ai_error(error)
+        self.textrenderer.blit_text(self.screen)
+        self.players.close()
+        pg.event.set_blocked(None)
+        pg.event.set_allowed(QUIT)
 
     def invalid_col(self, col):
         self.textrenderer.error_prompt(col)
-        self.textrenderer.highlight_cols(self.board.valid_inputs)
+        self.textrenderer.highlight_cols(self.session.board.valid_inputs)
         self.textrenderer.blit_text(self.screen)
 
     def mouse_token_placement(self, position):
@@ -106,25 +142,34 @@ class PyGame:
         self.sprites.move_hovertoken(position)
 
     def end_game(self) -> None:
-        self.textrenderer.end_game(self.winstate)
+        self.textrenderer.end_game(self.session.winstate)
         self.textrenderer.blit_text(self.screen)
         self.sprites.kill_hovertoken()
+        self.players.close()
         pg.event.set_blocked(None)
         pg.event.set_allowed(QUIT)
 
-    def update(self):
-        self.screen.draw_board()
-        self.sprites.draw(self.screen.image)
-        self.screen.transform_scale()
-
-    def event_loop(self):
-        for event in pg.event.get():
+    def update(self) -> bool:
+        """Draws what changed since the last frame. Returns whether the window was redrawn."""
+        self.screen.mark_dirty(self.sprites.draw(self.screen.image, self.screen.background))
+        return self.screen.transform_scale()
+
+    def event_loop(self, block: bool = False):
+        """Handles the queued events. With block, first waits for one if there are none."""
+        events = pg.event.get()
+        if block and not events:
+            events = [pg.event.wait()]
+        for event in events:
             if event.type == KEYDOWN and event.unicode.isnumeric():
                 self.human_turn(int(event.unicode) - 1)
             elif event.type == MOUSEBUTTONDOWN:
                 self.mouse_token_placement(event.pos)
             elif event.type == AI_TURN:
                 self.ai_turn()
+            elif event.type == AI_MOVE:
+                self.ai_move(event.col)
+            elif event.type == AI_ERROR:
+                self.ai_error(event.error)
             elif event.type == INVALID_COL:
                 self.invalid_col(event.col)
             if event.type == MOUSEMOTION:
@@ -133,14 +178,18 @@ class PyGame:
                 self.end_game()
             elif event.type == VIDEORESIZE:
                 self.screen.resize(event.size)
+            elif event.type == WINDOWEXPOSED:
+                self.screen.redraw()
             elif event.type == QUIT:
+                self.players.close()
                 pg.quit()
                 quit()
 
     def main(self):
+        """Presents a frame only when something changed, and sleeps until the next event
+        while no token is falling."""
         while self.running:
-            self.event_loop()
-            self.update()
-            pg.display.update()
-            pg.display.flip()
+            self.event_loop(block=not self.sprites.animating)
+            if self.update():
+                pg.display.update()
             self.clock.tick(self.fps)
@@ -1,4 +1,5 @@
 import pygame as pg
+from typing import List, Optional
 
 from connect4.visuals.tokens import draw_circle, row_col
 from connect4.visuals.theme import RGBColor
@@ -10,6 +11,12 @@ RADIUS = int(0.4 * UNIT)
 
 
 class Screen:
+    """The game is composed at full size on image and scaled to fit the window.
+
+    The board and text never move, so they are drawn once onto background. Sprites and text
+    report the areas they change with mark_dirty, which transform_scale uses to tell whether
+    the window needs redrawing. The scaled frame is cached until then."""
+
     def __init__(self, back_color: RGBColor, board_color: RGBColor, scale=0.4) -> None:
         startscale = (
             int(scale * WIDTH),
@@ -19,10 +26,13 @@ class Screen:
         self.board_col = board_color
         self.screen = pg.display.set_mode(startscale, pg.RESIZABLE)
         self.screen_rect = self.screen.get_rect()
+        self.background = pg.Surface((WIDTH, HEIGHT)).convert()
         self.image = pg.Surface((WIDTH, HEIGHT)).convert()
         self.image_rect = self.image.get_rect()
+        self.scaled: Optional[pg.Surface] = None
+        self.dirty: List[pg.Rect] = []
 
-        self.image.fill(board_color)
+        self.background.fill(board_color)
         self.draw_board()
         self.scale = (1, 1)
 
@@ -37,6 +47,15 @@ class Screen:
     def resize(self, size):
         self.screen = pg.display.set_mode(size, pg.RESIZABLE)
         self.screen_rect = self.screen.get_rect()
+        self.redraw()
+
+    def redraw(self) -> None:
+        """Makes the next transform_scale draw the window even if nothing changed."""
+        self.scaled = None
+
+    def mark_dirty(self, rects: List[pg.Rect]) -> None:
+        """Records areas of image that have changed since the window was last drawn."""
+        self.dirty.extend(rects)
 
     def set_scale(self, size):
         w_ratio = size[0] / float(self.screen_rect.w)
@@ -48,33 +67,49 @@ class Screen:
         start = (self.width - abs_w) / 2
         return int(min(max(0, WIDTH * (x - start) / abs_w), WIDTH - 1))
 
-    def transform_scale(self):
+    def transform_scale(self) -> bool:
+        """Draws image to the window if it changed or the window was resized.
+        Returns whether the window was drawn."""
+        if self.scaled is not None and not self.dirty:
+            return False
+        self.dirty = []
+
         if self.screen_rect.size == (WIDTH, HEIGHT):
+            self.scaled = self.image
             self.screen.blit(self.image, (0, 0))
-            return
+            return True
 
         fit_to_rect = self.image_rect.fit(self.screen_rect)
         fit_to_rect.center = self.screen_rect.center
-        scaled = pg.transform.smoothscale(self.image, fit_to_rect.size)
-        self.screen.blit(scaled, fit_to_rect)
-        self.set_scale(fit_to_rect.size)
+        self.scaled = pg.transform.smoothscale(self.image, fit_to_rect.size)
+        self.screen.fill(self.back_col)
+        self.screen.blit(self.scaled, fit_to_rect)
+        self.scale = self.set_scale(fit_to_rect.size)
+        return True
 
     def draw_board(self):
-        self.image.fill(self.board_col, (0, UNIT, WIDTH, HEIGHT))
+        """Draws the board onto the background and copies it to image."""
+        self.background.fill(self.board_col, (0, UNIT, WIDTH, HEIGHT))
         for i in range(7):
             for j in range(6):
                 r, c = row_col(j, i, WIDTH, UNIT)
                 draw_circle(
-                    self.image,
+                    self.background,
                     int(c + UNIT / 2),
                     int(r + UNIT / 2),
                     RADIUS,
                     self.back_col
                 )
         pg.draw.rect(
-            self.image, self.back_col, pg.Rect(0, UNIT, WIDTH, HEIGHT - 7 * UNIT)
+            self.background, self.back_col, pg.Rect(0, UNIT, WIDTH, HEIGHT - 7 * UNIT)
         )
+        self.image.blit(self.background, (0, 0))
+        self.mark_dirty([self.image_rect.copy()])
 
     def blit_text(self, text, position):
-        self.image.fill(self.back_col, (0, 0, WIDTH, HEIGHT))
-        self.image.blit(text, position)
+        """Replaces the text above the board"""
+        area = pg.Rect(0, 0, WIDTH, UNIT)
+        self.background.fill(self.back_col, area)
+        self.background.blit(text, position)
+        self.image.blit(self.background, area, area)
+        self.mark_dirty([area])
@@ -1,6 +1,7 @@
 import pygame as pg
 from pathlib import Path
 from queue import Queue
+from typing import Dict
 
 from connect4.board import Piece, WinState
 from connect4.visuals.screen import Screen
@@ -19,7 +20,9 @@ class TextHandler:
         pg.font.init()
         font_path = Path.cwd() / "assets" / "fonts" / f"{f_family}.ttf"
         self.font = pg.font.Font(font_path, f_size)
-        self.cols = [self.font.render(f"{i+1}", True, f_col) for i in range(7)]
+        # rendered text by string, ready to blit
+        self.rendered: Dict[str, pg.Surface] = {}
+        self.cols = [self.render(f"{i+1}") for i in range(7)]
         self.col_positions = [
             (int((i + 0.5) * spacing), int(spacing / 2)) for i in range(7)
         ]
@@ -29,35 +32,40 @@ class TextHandler:
             Piece.P2: "Player 2",
         }
 
+    def render(self, text: str) -> pg.Surface:
+        """Renders text in the theme's font and colour, or returns it from the last time"""
+        if text not in self.rendered:
+            surface = self.font.render(text, True, self.col)
+            self.rendered[text] = surface.convert_alpha() if pg.display.get_surface() else surface
+        return self.rendered[text]
+
     def highlight_cols(self, valid_inputs):
         for i in valid_inputs:
             self.queue.put((self.cols[i], self.col_positions[i]))
 
     def prompt_player(self, color: Piece) -> pg.Surface:
-        text = self.font.render(
-            f"{self.color_to_player[color]} to go...", True, self.col
-        )
+        text = self.render(f"{self.color_to_player[color]} to go...")
         self.queue.put((text, self.text_pos))
 
     def end_game(self, winstate: WinState) -> None:
-        text = self.font.render(
-            f"{self.color_to_player[winstate.winner]} player has won!", True, self.col
-        )
+        text = self.render(f"{self.color_to_player[winstate.winner]} player has won!")
+        self.queue.put((text, self.text_pos))
+
+    def ai_error(self, error: str) -> None:
+        text = self.render(f"The AI failed: {error}")
         self.queue.put((text, self.text_pos))
 
     def error_prompt(self, action: int) -> None:
         if not action == -1:
-            text = self.font.render(
-                f"Cannot add piece to column {action}", True, self.col
-            )
+            text = self.render(f"Cannot add piece to column {action}")
         else:
-            text = self.font.render("", True, self.col)
+            text = self.render("")
         self.queue.put((text, self.text_pos))
 
     def blit_text(self, screen: Screen):
         while not self.queue.empty():
             text, pos = self.queue.get()
-            screen.blit_text(text.convert_alpha(), pos)
+            screen.blit_text(text, pos)
 
     def prompt_and_blit(self, screen: Screen, valid_inputs, color):
         self.highlight_cols(valid_inputs)
@@ -1,6 +1,6 @@
 import pygame as pg
 from pygame import gfxdraw
-from typing import Tuple
+from typing import Dict, List, Tuple
 
 RGBColor = Tuple[int, int, int]
 
@@ -23,18 +23,35 @@ def draw_token(surf, middle, radius, color):
     draw_circle(surf, middle, middle, int(0.75 * radius), darker(color))
 
 
+# rendered token images by colour, size and radius, shared by every sprite that looks the same
+_token_images: Dict[Tuple[RGBColor, int, int], pg.Surface] = {}
+
+
+def token_image(color: RGBColor, spacing: int, radius: int) -> pg.Surface:
+    """spacing square image of a token, drawn the first time it is needed. Don't draw on it."""
+    key = ((color[0], color[1], color[2]), spacing, radius)
+    if key not in _token_images:
+        image = pg.Surface([spacing, spacing])
+        image.fill((255, 255, 255))
+        image.set_colorkey((255, 255, 255))
+        draw_token(image, int(spacing / 2), radius, color)
+        _token_images[key] = image.convert() if pg.display.get_surface() else image
+    return _token_images[key]
+
+
+def clear_token_images() -> None:
+    """Forgets the rendered tokens, e.g. when the theme changes."""
+    _token_images.clear()
+
+
 class AbstractToken(pg.sprite.Sprite):
     def __init__(
         self, color: RGBColor, pos: Tuple[int, int], spacing: int, radius: int
     ) -> None:
         super().__init__()
-        middle = int(spacing / 2)
         self.spacing = spacing
 
-        self.image = pg.Surface([spacing, spacing])
-        self.image.fill((255, 255, 255))
-        self.image.set_colorkey((255, 255, 255))
-        draw_token(self.image, middle, radius, color)
+        self.image = token_image(color, spacing, radius)
         self.rect = self.image.get_rect()
         self.change_pos(pos)
 
@@ -61,6 +78,10 @@ class Token(AbstractToken):
         self.y = int(width - (7) * spacing)
         self.x = pos[1]
 
+    @property
+    def falling(self) -> bool:
+        return self.y != self.final_y
+
     def update(self) -> None:
         if self.y != self.final_y:
             self.y += self.spacing
@@ -84,11 +105,18 @@ class Sprites:
         self.finallayer = pg.sprite.Group()
         self.unit = unit
         self.width = width
+        # where each sprite was last drawn
+        self.drawn: Dict[pg.sprite.Sprite, pg.Rect] = {}
 
         self.marker = Marker(markercol, self._row_col(-1, -1), self.unit)
         self.add_hovertoken(color)
         self.finallayer.add(self.marker)
 
+    @property
+    def animating(self) -> bool:
+        """Whether a token is still falling into place"""
+        return any(isinstance(s, Token) and s.falling for s in self.sprites)
+
     def _row_col(self, r, c):
         return row_col(r, c, w=self.width, spacing=self.unit)
 
@@ -111,8 +139,22 @@ class Sprites:
     def move_hovertoken(self, pos):
         self.hovertoken.change_pos(self._row_col(6, pos // self.unit))
 
-    def draw(self, window):
-        self.sprites.update()
-        self.sprites.draw(window)
-        self.finallayer.update()
-        self.finallayer.draw(window)
+    def draw(self, window, background) -> List[pg.Rect]:
+        """Redraws the sprites that moved, appeared or were removed since the last call, restoring
+        the background behind them. Returns the areas of window that changed."""
+        sprites = self.sprites.sprites() + self.finallayer.sprites()
+        current = {}
+        for sprite in sprites:
+            sprite.update()
+            current[sprite] = sprite.rect.copy()
+
+        dirty = [rect for sprite, rect in self.drawn.items() if current.get(sprite) != rect]
+        dirty += [rect for sprite, rect in current.items() if self.drawn.get(sprite) != rect]
+        for rect in dirty:
+            window.blit(background, rect, rect)
+        # sprites overlapping a restored area are redrawn in drawing order
+        for sprite in sprites:
+            if sprite.rect.collidelist(dirty) != -1:
+                window.blit(sprite.image, sprite.rect)
+        self.drawn = current
+        return dirty
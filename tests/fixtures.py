@@ -1,6 +1,7 @@
 import pytest
 import numpy as np
 from connect4 import Board, Piece
+from connect4.solver import Position
 
 @pytest.fixture
 def nearly_full_board():
@@ -24,34 +25,46 @@ def nearly_full_board():
 
 @pytest.fixture
 def p1_winner_board():
-    b = Board()
+    board = Board()
+
+    a, b, c = Piece.EMPTY, Piece.P1, Piece.P2
 
-    b.grid = np.array(
-        [[2, 2, 3, 2, 3, 2, 3],
-        [3, 3, 2, 3, 3, 2, 3],
-        [2, 3, 2, 3, 2, 3, 2],
-        [3, 2, 2, 2, 2, 2, 3],
-        [3, 2, 1, 3, 3, 3, 2],
-        [2, 2, 1, 2, 3, 3, 3]]
-    ).astype(type(Piece))
-    b.input_idx = np.array([6, 6, 3, 6, 6, 6, 6])
-    b.last_pos = (3,2)
+    board.grid = np.array(
+        [[b, b, c, b, c, b, c],
+        [c, c, b, c, c, b, c],
+        [b, c, b, c, b, c, b],
+        [c, b, b, b, b, b, c],
+        [c, b, a, c, c, c, b],
+        [b, b, a, b, c, c, c]]
+    , dtype=Piece)
+    board.input_idx = np.array([6, 6, 3, 6, 6, 6, 6])
+    board.last_pos = (3,2)
 
-    return b
+    return board
 
 @pytest.fixture
 def drawn_board():
-    b = Board()
-
-    b.grid = np.array(
-        [[2, 2, 3, 2, 3, 2, 3],
-        [3, 3, 2, 3, 2, 2, 3],
-        [2, 2, 2, 3, 3, 3, 2],
-        [3, 3, 3, 2, 2, 2, 3],
-        [3, 2, 2, 3, 3, 3, 2],
-        [2, 3, 3, 2, 3, 3, 3]]
-    ).astype(Piece)
-    b.input_idx = np.array([6, 6, 6, 6, 6, 6, 6])
-    b.last_pos = (5,2)
-
-    return b
\ No newline at end of file
+    board = Board()
+
+    b, c = Piece.P1, Piece.P2
+
+    board.grid = np.array(
+        [[b, b, c, b, c, b, c],
+        [c, c, b, c, b, b, c],
+        [b, b, b, c, c, c, b],
+        [c, c, c, b, b, b, c],
+        [c, b, b, c, c, c, b],
+        [b, c, c, b, c, c, c]]
+    , dtype=Piece)
+    board.input_idx = np.array([6, 6, 6, 6, 6, 6, 6])
+    board.last_pos = (5,2)
+
+    return board
+
+
+def position(moves: str) -> Position:
+    """Position after playing the 1-indexed columns in the string."""
+    p = Position()
+    for ch in moves:
+        p = p.play_col(int(ch) - 1)
+    return p
@@ -0,0 +1,68 @@
+import io
+import json
+import math
+import pytest
+
+from connect4.arena import (
+    GameResult,
+    PlayerSpec,
+    elo_ratings,
+    run_games,
+    schedule,
+    sprt,
+    sprt_llr,
+    standings,
+)
+
+RAND = PlayerSpec.parse("rand")
+MINIMAX = PlayerSpec.parse("minimax:depth=2")
+
+
+def test_parse_spec():
+    spec = PlayerSpec.parse("mcts:its=500,batch=8")
+    assert spec == ("mcts", {"its": 500, "batch": 8}, "mcts:its=500,batch=8")
+    with pytest.raises(ValueError):
+        PlayerSpec.parse("human")
+
+
+def test_schedule_alternates_colours():
+    pairings = schedule([RAND, MINIMAX, PlayerSpec.parse("mcts")], 4)
+    assert len(pairings) == 3 * 4
+    assert sum(p1 == RAND for p1, _ in pairings) == 4
+
+
+def test_round_robin_streams_results():
+    out = io.StringIO()
+    results = run_games(schedule([RAND, MINIMAX], 6), workers=2, out=out)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(results) == len(lines) == 6
+    assert tuple(lines[0]) == GameResult._fields
+    assert sum(r["p1"] == "rand" for r in lines) == 3
+
+    table = standings(results)
+    assert [s.games for s in table] == [6, 6]
+    assert table[0].label == "minimax:depth=2"
+    assert table[0].wins == table[1].losses
+
+
+def test_elo_ratings():
+    even = [GameResult("a", "b", 1, 10, 0), GameResult("b", "a", 1, 10, 0)]
+    assert elo_ratings(even) == pytest.approx({"a": 0, "b": 0}, abs=1e-6)
+    # with the virtual draw, 3 wins is a score of 3.5 / 4, odds of 7 to 1
+    ratings = elo_ratings([GameResult("a", "b", 1, 10, 0)] * 3)
+    assert ratings["a"] - ratings["b"] == pytest.approx(400 * math.log10(7))
+
+
+def test_sprt_llr():
+    assert sprt_llr(0, 0, 0, 0, 10) == pytest.approx(0, abs=0.1)
+    assert sprt_llr(60, 10, 30, 0, 10) > 0
+    assert sprt_llr(30, 10, 60, 0, 10) < 0
+
+
+def test_sprt_stops_early():
+    out = io.StringIO()
+    result = sprt(MINIMAX, RAND, 0, 200, max_games=200, workers=2, out=out)
+    assert result.accepted is True
+    assert 0 < result.wins + result.draws + result.losses < 200
+    assert result.wins > result.losses
+    assert len(out.getvalue().splitlines()) == result.wins + result.draws + result.losses
@@ -0,0 +1,14 @@
+from connect4.bench import BENCHMARKS, compare, run
+
+
+def test_benchmarks_run():
+    for func, _ in BENCHMARKS.values():
+        assert func(1) > 0
+    results = run(["board.get_win_state"], repeat=1)
+    assert list(results) == ["board.get_win_state"]
+    assert results["board.get_win_state"] > 0
+
+
+def test_compare_flags_regressions():
+    baseline = {"a": 100.0, "b": 100.0, "c": 100.0}
+    assert compare({"a": 95.0, "b": 80.0, "new": 1.0}, baseline, tolerance=0.1) == ["b"]
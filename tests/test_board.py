@@ -2,7 +2,7 @@
 import pytest
 import numpy as np
 
-from connect4 import Board, WinState, Piece
+from connect4 import Board, BoardBatch, WinState, Piece
 from tests.fixtures import (
     nearly_full_board, p1_winner_board, drawn_board
     )
@@ -65,3 +65,111 @@ def test_winner(nearly_full_board, p1_winner_board, drawn_board):
     assert b.get_win_state(Piece.P1) == WinState(True, Piece.P1)
     b = drawn_board
     assert b.get_win_state(Piece.P1) == WinState(True, Piece.EMPTY)
+
+
+@pytest.mark.parametrize(
+    "moves",
+    [
+        [0, 0, 0, 0],  # vertical
+        [0, 1, 2, 3],  # horizontal
+        [3, 4, 5, 6],  # horizontal at the edge
+    ],
+)
+def test_winner_straight_lines(moves):
+    b = Board()
+    for col in moves[:-1]:
+        assert b.update(col, Piece.P1) == WinState(False, Piece.EMPTY)
+    assert b.update(moves[-1], Piece.P1) == WinState(True, Piece.P1)
+
+
+def test_winner_diagonals():
+    b = Board()
+    for col, piece in [(1, Piece.P2), (2, Piece.P2), (2, Piece.P2), (3, Piece.P2), (3, Piece.P2), (3, Piece.P2)]:
+        b.add_piece(col, piece)
+    for col in [0, 1, 2]:
+        assert b.update(col, Piece.P1) == WinState(False, Piece.EMPTY)
+    assert b.update(3, Piece.P1) == WinState(True, Piece.P1)
+
+    b = Board()
+    for col, piece in [(5, Piece.P1), (4, Piece.P1), (4, Piece.P1), (3, Piece.P1), (3, Piece.P1), (3, Piece.P1)]:
+        b.add_piece(col, piece)
+    for col in [6, 5, 4]:
+        assert b.update(col, Piece.P2) == WinState(False, Piece.EMPTY)
+    assert b.update(3, Piece.P2) == WinState(True, Piece.P2)
+
+
+def test_no_wrap_between_columns():
+    b = Board()
+    # pieces stacked to the top of column 0 and the bottom of column 1 must not join up
+    for col, piece in [(0, Piece.P2), (0, Piece.P2), (0, Piece.P2), (0, Piece.P1), (0, Piece.P1), (0, Piece.P1)]:
+        b.add_piece(col, piece)
+    assert b.update(1, Piece.P1) == WinState(False, Piece.EMPTY)
+
+
+def test_grid_round_trip(nearly_full_board):
+    b = Board()
+    b.grid = nearly_full_board.grid
+    assert (b.grid == nearly_full_board.grid).all()
+    assert b.bitboards == nearly_full_board.bitboards
+
+
+def test_hash_is_incremental():
+    b = Board()
+    for col, piece in [(3, Piece.P1), (3, Piece.P2), (4, Piece.P1)]:
+        b.add_piece(col, piece)
+    h = b.hash
+
+    other = Board()
+    other.grid = b.grid
+    assert other.hash == h
+
+    b.add_piece(0, Piece.P2)
+    assert b.hash != h
+    b.undo()
+    assert b.hash == h
+
+    # the same position reached by a different move order has the same hash
+    b = Board()
+    for col, piece in [(4, Piece.P1), (3, Piece.P2), (3, Piece.P1)]:
+        b.add_piece(col, piece)
+    assert b.hash != h
+    b.undo()
+    b.undo()
+    b.add_piece(3, Piece.P1)
+    b.add_piece(3, Piece.P2)
+    assert b.hash == h
+
+
+def test_grid_is_read_only():
+    b = Board()
+    b.add_piece(0, Piece.P1)
+    with pytest.raises(ValueError):
+        b.grid[0, 1] = Piece.P2
+
+
+def test_board_batch_matches_board():
+    rng = np.random.default_rng(0)
+    n = 50
+    batch = BoardBatch(n)
+    boards = [Board() for _ in range(n)]
+    states = [WinState(False, Piece.EMPTY)] * n
+    while not batch.done.all():
+        valid = batch.valid_moves
+        cols = np.argmax(rng.random(valid.shape) * valid, axis=1)
+        pieces = batch.to_move.copy()
+        batch.update(cols)
+        for i, b in enumerate(boards):
+            if not states[i].is_ended:
+                states[i] = b.update(int(cols[i]), Piece(pieces[i]))
+            assert (batch.grid[i] == b.grid).all()
+            assert batch.done[i] == states[i].is_ended
+            assert batch.winner[i] == states[i].winner
+    assert not batch.valid_moves.any()
+
+
+def test_board_batch_full_column():
+    batch = BoardBatch(2)
+    for _ in range(6):
+        batch.add_piece(np.array([0, 1]), Piece.P1)
+    with pytest.raises(ValueError):
+        batch.add_piece(np.array([0, 1]), Piece.P2)
@@ -0,0 +1,56 @@
+from connect4 import Board, Piece
+from connect4.book import OpeningBook, generate, mirror
+from connect4.players import create_player
+from connect4.solver import Position, Solver
+from tests.fixtures import position
+
+ROOT = "1233722555341451114725221333"
+
+
+def test_book_has_exact_scores(tmp_path):
+    path = tmp_path / "book.npy"
+    n = generate(str(path), 2, position(ROOT))
+    book = OpeningBook(str(path))
+    assert len(book) == n > 1
+    assert (book.keys[1:] > book.keys[:-1]).all()
+
+    solver = Solver()
+    for moves in [ROOT, ROOT + "4", ROOT + "46"]:
+        p = position(moves)
+        assert book.get(p) == solver.solve(p)
+        # the mirror image shares the entry
+        flipped = position("".join(str(8 - int(c)) for c in moves))
+        assert flipped.key() == mirror(p.key())
+        assert book.get(flipped) == book.get(p)
+    assert book.get(position("4")) is None
+
+
+def test_book_is_written_to_the_given_path(tmp_path):
+    path = tmp_path / "book"
+    n = generate(str(path), 1, position(ROOT))
+    assert path.exists()
+    assert len(OpeningBook(str(path))) == n
+
+
+def test_player_uses_book(tmp_path):
+    path = tmp_path / "book.npy"
+    generate(str(path), 1, position(ROOT))
+    book = OpeningBook(str(path))
+    p = position(ROOT)
+    scores = Solver().analyse(p)
+    assert scores[book.best_move(p)] == max(s for s in scores if s is not None)
+
+    b = Board()
+    piece = Piece.P1
+    for ch in ROOT:
+        b.add_piece(int(ch) - 1, piece)
+        piece = Piece(-piece)
+    player = create_player("rand", piece, book=str(path))
+    assert player.get_action(b) == book.best_move(p)
+
+    # a move from the book stops the wrapped player pondering
+    player = create_player("minimax", piece, book=str(path), depth=1, ponder=True)
+    player.ponder(b)
+    assert player.get_action(b) == book.best_move(p)
+    assert player.player._ponder_thread is None
+    assert book.best_move(Position()) is None
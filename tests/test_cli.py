@@ -0,0 +1,83 @@
+import io
+
+from connect4 import Board, Piece
+from connect4.cli import Terminal
+from connect4.configs import TerminalTheme
+from connect4.players import Opponents, Rand
+
+
+THEME = TerminalTheme(FORE="white", BACK="black", P1="red", P2="yellow", EMPTY="white")
+
+
+def show(terminal: Terminal, b: Board) -> None:
+    terminal.update(b)
+    terminal.flush()
+
+
+def test_incremental_update_draws_changes(capsys):
+    b = Board()
+    full, incremental = Terminal(THEME), Terminal(THEME, incremental=True)
+    for terminal in (full, incremental):
+        show(terminal, b)
+    first = capsys.readouterr().out
+    assert first[: len(first) // 2] == first[len(first) // 2 :]
+
+    b.add_piece(3, Piece.P1)
+    show(full, b)
+    frame = capsys.readouterr().out
+    show(incremental, b)
+    changes = capsys.readouterr().out
+    assert changes.count(incremental[Piece.P1]) == 1
+    assert len(changes) * 10 < len(frame)
+
+    # filling a column removes its number from the header
+    for _ in range(6):
+        b.add_piece(0, Piece.P2)
+    show(incremental, b)
+    assert incremental._at(0, 0, " ") in capsys.readouterr().out
+
+    incremental.forget()
+    show(incremental, b)
+    show(full, b)
+    out = capsys.readouterr().out
+    assert out[: len(out) // 2] == out[len(out) // 2 :]
+
+
+def test_every_limits_the_boards_shown():
+    games = {}
+    for every in (0, 1, 5):
+        out = io.StringIO()
+        terminal = Terminal(THEME, every=every, out=out)
+        terminal.main(Opponents("minimax", "minimax", {"depth": 1}, {"depth": 1}), Board())
+        games[every] = out.getvalue()
+    quiet, all_moves, some = games[0], games[1], games[5]
+
+    # the same deterministic game is summarised each time, with only the board lines differing
+    summary = quiet.splitlines()
+    assert len(summary) == 2 and summary[0].startswith("Player ")
+    n = len(summary[1].split(": ")[1])
+    assert summary[1].startswith(f"{n} moves in ")
+    for out in (all_moves, some):
+        assert out.splitlines()[-1].split(" in ")[0] == summary[1].split(" in ")[0]
+    # each board is followed by a blank line: the start, every fifth move and the end
+    assert all_moves.count("\n\n") == n + 1
+    assert some.count("\n\n") == len(range(0, n, 5)) + 1
+
+
+def test_each_board_is_written_before_the_next_move():
+    for incremental in (False, True):
+        out = io.StringIO()
+        written = []
+
+        class Watched(Rand):
+            def get_action(self, b):
+                written.append(out.getvalue())
+                return super().get_action(b)
+
+        players = Opponents("rand", "rand")
+        players.p1, players.p2 = Watched(Piece.P1), Watched(Piece.P2)
+        Terminal(THEME, incremental=incremental, every=1, out=out).main(players, Board())
+        # every move's board, drawn in full or over the last one, is out before the next move
+        assert all(len(a) < len(b) for a, b in zip(written, written[1:]))
+        if not incremental:
+            assert [text.count("\n\n") for text in written] == list(range(1, len(written) + 1))
@@ -0,0 +1,44 @@
+import numpy as np
+
+from connect4 import Board, Piece
+from connect4.evaluate import CELL_WINDOWS, WINDOWS, WindowEvaluator
+
+
+def test_windows():
+    assert len(WINDOWS) == 69
+    assert len({tuple(w) for w in WINDOWS}) == 69
+    # a corner is in 3 lines of four and a centre cell in 13
+    assert len(CELL_WINDOWS[0]) == 3
+    assert len(CELL_WINDOWS[3 * Board.h1 + 3]) == 13
+
+
+def test_incremental_matches_rebuild():
+    rng = np.random.default_rng(0)
+    b = Board()
+    ev = WindowEvaluator()
+    piece = Piece.P1
+    for _ in range(30):
+        col = int(rng.choice(b.valid_inputs))
+        b.add_piece(col, piece)
+        ev.add(b.last_pos[0], col, piece)
+        assert ev.value == WindowEvaluator(b).value
+        assert ev.counts == WindowEvaluator(b).counts
+        piece = Piece(-piece)
+
+    for _ in range(30):
+        col, piece, _ = b.history[-1]
+        row = b.last_pos[0]
+        b.undo()
+        ev.remove(row, col, piece)
+    assert ev.value == 0
+    assert ev.counts == WindowEvaluator().counts
+
+
+def test_value_favours_open_three():
+    b = Board()
+    swapped = Board()
+    for col, piece in [(2, Piece.P1), (0, Piece.P2), (3, Piece.P1), (6, Piece.P2), (4, Piece.P1)]:
+        b.add_piece(col, piece)
+        swapped.add_piece(col, Piece(-piece))
+    assert WindowEvaluator(b).value > 0
+    assert WindowEvaluator(swapped).value == -WindowEvaluator(b).value
@@ -0,0 +1,56 @@
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame as pg  # noqa: E402
+
+from connect4.players import Human, Opponents  # noqa: E402
+from connect4.visuals.game import PyGame  # noqa: E402
+from connect4.visuals.theme import pygame_theme_from_file  # noqa: E402
+
+
+def new_game(ai: str = "minimax", **options) -> PyGame:
+    players = Opponents("human", ai, p2_options=options)
+    return PyGame(players, pygame_theme_from_file("default"))
+
+
+def wait_for_ai(game: PyGame, seconds: float = 5.0) -> None:
+    """Handles events until the AI's search has finished."""
+    deadline = time.perf_counter() + seconds
+    while game.thinking and time.perf_counter() < deadline:
+        game.event_loop()
+        time.sleep(0.01)
+    assert not game.thinking
+
+
+def test_ai_moves_after_human():
+    game = new_game(depth=1)
+    try:
+        game.human_turn(3)
+        assert game.thinking
+        # the human's input is ignored while the AI thinks
+        game.human_turn(2)
+        wait_for_ai(game)
+        assert len(game.session.moves) == 2
+        assert game.session.moves[0] == 3
+        assert isinstance(game.players.current, Human)
+    finally:
+        game.players.close()
+        pg.quit()
+
+
+def test_ai_error_is_shown():
+    game = new_game(depth=1)
+
+    def fail(b):
+        raise RuntimeError("the pool broke")
+
+    game.players.next.get_action = fail
+    try:
+        game.human_turn(3)
+        wait_for_ai(game)
+        assert game.session.moves == [3]
+        assert "The AI failed: the pool broke" in game.textrenderer.rendered
+    finally:
+        pg.quit()
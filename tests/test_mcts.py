@@ -0,0 +1,142 @@
+import time
+import numpy as np
+
+from connect4 import Board, Piece
+from connect4.mcts import MCTSTree, mcts, parallel_mcts
+from connect4.players import create_player
+
+
+def test_mcts_takes_win():
+    b = Board()
+    for col in [0, 1, 2]:
+        b.add_piece(col, Piece.P1)
+        b.add_piece(col, Piece.P2)
+    action, value = mcts(b, Piece.P1, iterations=300, tree=MCTSTree(seed=0))
+    assert action == 3
+    assert value > 0.9
+    assert len(b.history) == 6
+
+
+def test_tree_reused_after_opponent_reply():
+    b = Board()
+    tree = MCTSTree(seed=0)
+    action, _ = mcts(b, Piece.P1, iterations=500, tree=tree)
+    b.add_piece(action, Piece.P1)
+    start, end = tree._children(tree._child(tree.root, action))
+    reply = start + int(np.argmax(tree.visits[start:end]))
+    visits, n_children = tree.visits[reply], tree.n_children[reply]
+    b.add_piece(int(tree.move[reply]), Piece.P2)
+
+    mcts(b, Piece.P1, iterations=10, tree=tree)
+    assert tree.visits[tree.root] == visits + 10
+    assert tree.n_children[tree.root] == n_children
+    assert tree.parent[tree.root] == -1
+    assert tree.size < 500
+    # every node's children point back to it after compaction
+    for node in range(tree.size):
+        start, end = tree._children(node)
+        assert all(tree.parent[start:end] == node)
+
+
+def test_tree_reset_for_unrelated_position():
+    tree = MCTSTree(seed=0)
+    b = Board()
+    mcts(b, Piece.P1, iterations=50, tree=tree)
+
+    b = Board()
+    b.add_piece(6, Piece.P2)
+    mcts(b, Piece.P1, iterations=50, tree=tree)
+    assert tree.visits[tree.root] == 50
+
+
+def test_tree_growth_and_limit():
+    b = Board()
+    tree = MCTSTree(seed=0, chunk=64)
+    mcts(b, Piece.P1, iterations=200, tree=tree)
+    assert tree.capacity % 64 == 0
+    assert tree.size <= tree.capacity
+
+    tree = MCTSTree(seed=0, chunk=64, max_nodes=100)
+    mcts(b, Piece.P1, iterations=500, tree=tree)
+    assert tree.size <= 100
+    assert tree.visits[tree.root] == 500
+
+
+def test_parallel_mcts_takes_win():
+    b = Board()
+    for col in [0, 1, 2]:
+        b.add_piece(col, Piece.P1)
+        b.add_piece(col, Piece.P2)
+    action, value = parallel_mcts(b, Piece.P1, iterations=200, workers=2, seed=0)
+    assert action == 3
+    assert value > 0.9
+
+
+def test_batched_leaf_evaluation():
+    b = Board()
+    for col in [0, 1, 2]:
+        b.add_piece(col, Piece.P1)
+        b.add_piece(col, Piece.P2)
+    tree = MCTSTree(seed=0, batch=32)
+    action, value = mcts(b, Piece.P1, iterations=100, tree=tree)
+    assert action == 3
+    assert tree.visits[tree.root] == 100 * 32
+
+
+def test_mcts_player_reports_without_printing(capsys):
+    b = Board()
+    player = create_player("mcts", Piece.P1, its=50)
+    assert player.get_action(b) in b.valid_inputs
+    assert 0 <= player.value <= 1
+    assert player.iterations_per_second > 0
+    assert player.report.move == player.report.pv[0]
+    assert player.report.iterations == 50
+    # every expansion adds all of a leaf's children
+    assert 50 < player.report.nodes == player.tree.size - 1
+    assert player.report.memory == player.tree.nbytes
+    assert capsys.readouterr().out == ""
+
+
+def test_parallel_mcts_player_shuts_down_pool():
+    b = Board()
+    for col in [0, 1, 2]:
+        b.add_piece(col, Piece.P1)
+        b.add_piece(col, Piece.P2)
+    player = create_player("mcts", Piece.P1, its=100, workers=2)
+    assert player.tree is None
+    try:
+        assert player.get_action(b) == 3
+        assert player.report.nodes == player.report.iterations == 200
+    finally:
+        player.close()
+    assert player.pool is None
+
+
+def test_mcts_ponders_on_opponent_turn():
+    b = Board()
+    player = create_player("mcts", Piece.P1, its=20, ponder=True)
+    b.add_piece(player.get_action(b), Piece.P1)
+    player.ponder(b)
+    time.sleep(0.2)
+    player.stop_pondering()
+    pondered = int(player.tree.visits[player.tree.root])
+    assert pondered > 20
+
+    # the opponent's move keeps its subtree, which already has visits from pondering
+    b.add_piece(3, Piece.P2)
+    reused = int(player.tree.visits[player.tree._child(player.tree.root, 3)])
+    player.get_action(b)
+    assert player.tree.visits[player.tree.root] == reused + 20 > 20
+    player.close()
+
+
+def test_mcts_pondering_stops_when_tree_is_full():
+    b = Board()
+    player = create_player("mcts", Piece.P1, its=20, ponder=True, max_nodes=300)
+    b.add_piece(player.get_action(b), Piece.P1)
+    player.ponder(b)
+    player._ponder_thread.join(5)
+    assert not player._ponder_thread.is_alive()
+    assert player.tree.full
+    assert player.tree.size <= 300
+    player.close()
@@ -0,0 +1,152 @@
+import json
+import math
+import pytest
+import time
+
+from connect4 import Board, Piece
+from connect4.minmax import TranspositionTable, iterative_deepening, minimax
+from connect4.players import create_player
+from tests.fixtures import drawn_board
+
+
+def test_undo_restores_board():
+    b = Board()
+    b.add_piece(3, Piece.P1)
+    bitboards, heights, last_pos = dict(b.bitboards), b.input_idx.copy(), b.last_pos
+    grid = b.grid.copy()
+
+    b.add_piece(3, Piece.P2)
+    b.add_piece(4, Piece.P1)
+    b.undo()
+    b.undo()
+
+    assert b.bitboards == bitboards
+    assert all(b.input_idx == heights)
+    assert b.last_pos == last_pos
+    assert (b.grid == grid).all()
+
+
+def test_minimax_takes_win():
+    b = Board()
+    for col in [0, 1, 2]:
+        b.add_piece(col, Piece.P1)
+        b.add_piece(col, Piece.P2)
+    result = minimax(b, 3, -math.inf, math.inf, True)
+    assert result.c == 3
+    assert result.score == math.inf
+    assert len(b.history) == 6
+
+
+def test_minimax_blocks_win():
+    b = Board()
+    for col in [0, 0, 0]:
+        b.add_piece(col, Piece.P1)
+    b.add_piece(6, Piece.P2)
+    result = minimax(b, 2, -math.inf, math.inf, False)
+    assert result.c == 0
+
+
+def test_transposition_table_gives_same_result():
+    b = Board()
+    for col, piece in [(3, Piece.P1), (2, Piece.P2), (3, Piece.P1), (4, Piece.P2)]:
+        b.add_piece(col, piece)
+    plain = minimax(b, 5, -math.inf, math.inf, True)
+    tt = TranspositionTable(1 << 12)
+    cached = minimax(b, 5, -math.inf, math.inf, True, tt=tt)
+    assert cached.score == plain.score
+    assert tt.hits > 0
+
+    # a second search of the same position is answered from the table
+    probes = tt.probes
+    assert minimax(b, 5, -math.inf, math.inf, True, tt=tt).score == plain.score
+    assert tt.probes == probes + 1
+
+
+def test_iterative_deepening_respects_budget():
+    b = Board()
+    start = time.perf_counter()
+    result, depth = iterative_deepening(b, True, 0.2)
+    assert time.perf_counter() - start < 1
+    assert depth >= 2
+    assert result.c in b.valid_inputs
+    assert len(b.history) == 0
+
+
+def test_iterative_deepening_max_depth_and_win():
+    b = Board()
+    assert iterative_deepening(b, True, 10, max_depth=3)[1] == 3
+
+    for col in [0, 1, 2]:
+        b.add_piece(col, Piece.P1)
+        b.add_piece(col, Piece.P2)
+    result, depth = iterative_deepening(b, True, 10)
+    assert result == (3, math.inf)
+    assert depth == 1
+
+
+@pytest.mark.parametrize("player", [True, False])
+def test_minimax_scores_draw(drawn_board, player):
+    grid = drawn_board.grid.copy()
+    grid[5, 2] = Piece.EMPTY
+    drawn_board.grid = grid
+    drawn_board.input_idx[2] = 5
+    assert minimax(drawn_board, 3, -math.inf, math.inf, player) == (2, 0)
+    assert iterative_deepening(drawn_board, player, 1)[0] == (2, 0)
+
+
+def test_timed_minimax_player_takes_win():
+    b = Board()
+    for col in [0, 1, 2]:
+        b.add_piece(col, Piece.P1)
+        b.add_piece(col, Piece.P2)
+    player = create_player("minimax", Piece.P1, seconds=0.1)
+    start = time.perf_counter()
+    assert player.get_action(b) == 3
+    assert time.perf_counter() - start < 1
+
+
+def test_timed_minimax_player_is_not_depth_limited():
+    assert create_player("minimax", Piece.P1).depth == 5
+    assert create_player("minimax", Piece.P1, seconds=0.1).depth is None
+    assert create_player("minimax", Piece.P1, depth=3, seconds=0.1).depth == 3
+
+
+def test_minimax_player_reports_search(tmp_path):
+    b = Board()
+    for col, piece in [(3, Piece.P1), (2, Piece.P2), (3, Piece.P1), (4, Piece.P2)]:
+        b.add_piece(col, piece)
+    log = tmp_path / "search.jsonl"
+    player = create_player("minimax", Piece.P1, depth=4, log=str(log))
+    action = player.get_action(b)
+
+    report = player.report
+    assert report.move == action == report.pv[0]
+    assert report.depth == 4
+    assert 1 <= len(report.pv) <= 4
+    assert report.nodes > report.cutoffs > 0
+    assert 0 <= report.tt_hit_rate <= 1
+    assert report.memory > 0
+    assert len(b.history) == 4
+
+    player.get_action(b)
+    lines = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(lines) == 2
+    assert lines[0]["move"] == action
+    assert lines[0]["color"] == Piece.P1
+
+
+def test_minimax_ponders_into_table():
+    b = Board()
+    b.add_piece(3, Piece.P1)
+    player = create_player("minimax", Piece.P1, depth=4, ponder=True)
+    player.ponder(b)
+    time.sleep(0.1)
+    start = time.perf_counter()
+    player.stop_pondering()
+    assert time.perf_counter() - start < 0.1
+    assert player.tt.filled > 0
+    assert len(b.history) == 1
+
+    b.add_piece(3, Piece.P2)
+    assert player.get_action(b) in b.valid_inputs
+    assert player.report.tt_hit_rate > 0
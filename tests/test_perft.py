@@ -0,0 +1,37 @@
+import pytest
+
+from connect4 import Board, Piece
+from connect4.perft import perft
+from tests.fixtures import drawn_board
+
+
+@pytest.mark.parametrize("depth", range(6))
+def test_perft_opening(depth):
+    assert perft(Board(), depth, hashing=True) == (7**depth, 0, 0)
+
+
+def test_perft_first_wins():
+    # published count: sequences filling one column are illegal, and player 1 can win on move 7
+    assert perft(Board(), 7, symmetry=True) == (823536, 13032, 0)
+
+
+def test_perft_shortcuts_agree():
+    b = Board()
+    piece = Piece.P1
+    for ch in "4453325":
+        b.add_piece(int(ch) - 1, piece)
+        piece = Piece(-piece)
+    history = list(b.history)
+    plain = perft(b, 4, piece)
+    assert plain.wins > 0
+    assert perft(b, 4, piece, hashing=True) == plain
+    assert perft(b, 4, piece, symmetry=True) == plain
+    assert b.history == history
+
+
+def test_perft_counts_draws(drawn_board):
+    grid = drawn_board.grid.copy()
+    grid[5, 2] = Piece.EMPTY
+    drawn_board.grid = grid
+    drawn_board.input_idx[2] = 5
+    assert perft(drawn_board, 1, Piece.P1) == (1, 0, 1)
@@ -0,0 +1,36 @@
+import numpy as np
+
+from connect4 import Board, Piece
+from connect4.rollout import is_winner, random_playouts
+from tests.fixtures import drawn_board
+
+
+def test_is_winner_matches_board():
+    boards = []
+    for moves in [[0, 0, 0, 0], [0, 1, 2, 3], [0, 1, 2], [6, 5, 6, 5]]:
+        b = Board()
+        for col in moves:
+            b.add_piece(col, Piece.P1)
+        boards.append(b)
+    masks = np.array([b.bitboards[Piece.P1] for b in boards], dtype=np.uint64)
+    assert list(is_winner(masks)) == [b._is_winner(b.bitboards[Piece.P1]) for b in boards]
+
+
+def test_playouts_from_forced_win():
+    b = Board()
+    for col in [0, 1, 2]:
+        b.add_piece(col, Piece.P1)
+        b.add_piece(col, Piece.P2)
+    # with every other column marked as full, P1 has to play column 3 and win
+    for col in [0, 1, 2, 4, 5, 6]:
+        b.input_idx[col] = b.n_r
+    assert random_playouts(b, Piece.P1, 50, np.random.default_rng(0)) == (1.0, 0.0, 0.0)
+
+
+def test_playouts_fractions(drawn_board):
+    win, draw, loss = random_playouts(Board(), Piece.P1, 500, np.random.default_rng(0))
+    assert abs(win + draw + loss - 1) < 1e-9
+    # the first player wins more random games than they lose
+    assert win > loss
+
+    assert random_playouts(drawn_board, Piece.P1, 10) == (0.0, 1.0, 0.0)
@@ -0,0 +1,122 @@
+from typing import Dict
+import asyncio
+import json
+
+import pytest
+
+from connect4.arena import PlayerSpec
+from connect4.server import GameServer, allowed_spec
+from connect4.session import GameSession
+
+
+async def send(writer: asyncio.StreamWriter, message: Dict) -> None:
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+async def receive(reader: asyncio.StreamReader) -> Dict:
+    return json.loads(await reader.readline())
+
+
+async def play(port: int, opponent: str = "rand", first: bool = True) -> Dict:
+    """Plays the leftmost valid column every turn, returning the final message."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    await send(writer, {"opponent": opponent, "first": first})
+    message = await receive(reader)
+    while "valid" in message:
+        await send(writer, {"move": message["valid"][0]})
+        message = await receive(reader)
+    writer.close()
+    return message
+
+
+def run(test, **kwargs):
+    async def main():
+        server = GameServer(workers=2, **kwargs)
+        await server.start()
+        try:
+            return await test(server)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_games():
+    async def test(server):
+        return await asyncio.gather(
+            *(play(server.port, "minimax:depth=1", first=i % 2 == 0) for i in range(20))
+        )
+
+    for result in run(test, max_searches=3):
+        session = GameSession.from_moves(result["moves"])
+        assert session.is_ended
+        assert result["winner"] == session.winner
+
+
+def test_invalid_moves_and_timeouts():
+    async def test(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await send(writer, {"opponent": "rand"})
+        assert (await receive(reader))["moves"] == []
+        await send(writer, {"move": 7})
+        assert "error" in await receive(reader)
+        assert (await receive(reader))["moves"] == []
+        await send(writer, {"move": 3})
+        assert (await receive(reader))["moves"][0] == 3
+        # the client now waits too long to move
+        assert "error" in await receive(reader)
+        assert await reader.read() == b""
+        assert server.sessions == 0
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await send(writer, {"opponent": "human"})
+        assert "error" in await receive(reader)
+
+    run(test, timeout=0.5)
+
+
+def test_full_server_turns_clients_away():
+    async def test(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        await send(writer, {"opponent": "rand"})
+        await receive(reader)
+        assert server.sessions == 1
+        message = await play(server.port)
+        assert message == {"error": "The server is full."}
+        writer.close()
+
+    run(test, max_sessions=1)
+
+
+def test_disallowed_options_are_refused(tmp_path):
+    log = tmp_path / "written_by_client.jsonl"
+
+    async def test(server):
+        messages = []
+        for opponent in [
+            f"minimax:depth=1,log={log}",
+            "mcts:workers=64",
+            "minimax:depth=-1",
+            "minimax:depth=0.5",
+            "mcts:its=2.5",
+        ]:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            await send(writer, {"opponent": opponent})
+            messages.append(await receive(reader))
+            writer.close()
+        return messages
+
+    for message in run(test):
+        assert list(message) == ["error"]
+    assert not log.exists()
+
+
+def test_allowed_spec_clamps_options():
+    spec = allowed_spec(PlayerSpec.parse("minimax:depth=100,tt_size=1000000000"), {"depth": 4, "tt_size": 64})
+    assert spec.options == {"depth": 4, "tt_size": 64}
+    assert allowed_spec(PlayerSpec.parse("mcts:its=50")).options == {"its": 50}
+    assert allowed_spec(PlayerSpec.parse("solver:seconds=0.5")).options == {"seconds": 0.5}
+    for opponent in ["mcts:ponder=true", "minimax:book=book.npy", "solver:seconds=x", "perft"]:
+        with pytest.raises(ValueError):
+            allowed_spec(PlayerSpec.parse(opponent))
@@ -0,0 +1,61 @@
+import time
+import pytest
+
+from connect4 import Board, Piece
+from connect4.minmax import SearchTimeout
+from connect4.players import create_player
+from connect4.solver import Position, Solver, moves_to_end
+from tests.fixtures import position
+
+
+@pytest.mark.parametrize(
+    "moves, score",
+    [
+        ("2252576253462244111563365343671351441", -1),
+        ("7422341735647741166133573473242566", 1),
+        ("23163416124767223154467471272416755633", 0),
+        ("5552244262271456763515647627411745", 4),
+        ("1233722555341451114725221333", -1),
+    ],
+)
+def test_solve_scores(moves, score):
+    s = Solver(1 << 12)
+    assert s.solve(position(moves)) == score
+    assert s.solve(position(moves), weak=True) == (score > 0) - (score < 0)
+
+
+def test_moves_to_end():
+    # player 1 can complete the bottom row straight away
+    p = position("112233")
+    assert Solver().solve(p) == (42 + 1 - 6) // 2
+    assert moves_to_end(p, Solver().solve(p)) == 1
+    assert moves_to_end(p, 0) is None
+    # player 2 has three in the bottom row open at both ends, so player 1 loses after one more piece
+    q = position("737435")
+    assert Solver().solve(q) == -((42 - 6) // 2)
+    assert moves_to_end(q, Solver().solve(q)) == 1
+
+
+def test_solver_player_matches_analysis():
+    b = Board()
+    piece = Piece.P1
+    for ch in "1233722555341451114725221333":
+        b.add_piece(int(ch) - 1, piece)
+        piece = Piece(-piece)
+    p = Position.from_board(b, piece)
+    assert p.key() == position("1233722555341451114725221333").key()
+
+    scores = Solver().analyse(p)
+    action = create_player("solver", piece).get_action(b)
+    assert scores[action] == max(s for s in scores if s is not None)
+
+
+def test_solver_deadline_and_early_fallback():
+    with pytest.raises(SearchTimeout):
+        Solver().analyse(Position(), deadline=time.perf_counter() + 0.05)
+
+    b = Board()
+    player = create_player("solver", Piece.P1, seconds=0.1, fallback_seconds=0.1)
+    start = time.perf_counter()
+    assert player.get_action(b) in b.valid_inputs
+    assert time.perf_counter() - start < 2